@@ -7,7 +7,7 @@
 from __future__ import annotations
 
 from gitfourchette import settings, colors
-from gitfourchette.blameview.blamemodel import BlameModel
+from gitfourchette.blameview.blamemodel import BlameModel, Revision
 from gitfourchette.codeview.codegutter import CodeGutter
 from gitfourchette.localization import *
 from gitfourchette.porcelain import Oid
@@ -44,6 +44,9 @@ class BlameGutter(CodeGutter):
         self.heatColor = QColor()
         self.unknownColor = QColor()
 
+        self.heatColorsCache = []
+        self.heatColorsSource = None
+
         self.refreshMetrics()
 
     def syncFont(self, codeFont: QFont):
@@ -86,6 +89,9 @@ class BlameGutter(CodeGutter):
         self.unknownColor = QColor(colors.fuchsia)
         self.unknownColor.setAlphaF(.4 if isDarkTheme(self.palette()) else .6)
 
+        # Invalidate heat map
+        self.heatColorsSource = None
+
     def calcWidth(self) -> int:
         return self.preferredWidth
 
@@ -100,7 +106,7 @@ class BlameGutter(CodeGutter):
             return
 
         painter = QPainter(self)
-        bgColor = self.heatColor
+        bgColor = self.unknownColor
 
         # Gather some metrics
         rightEdge = self.rect().width() - 1
@@ -114,44 +120,40 @@ class BlameGutter(CodeGutter):
         painter.setPen(textPen)
 
         lastCaptionDrawnAtLine = -1
-        hunkCommitId = None
+        hunk = -1
         hunkStartLine = 1
+        nextHunkStartLine = 0
+        lineCommitId = None
 
         alignRight = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
 
+        revList = self.model.revList
         topCommitId = revision.commitId
-        topRevisionNumber = self.model.revList.revisionNumber(topCommitId)
+        lineCount = len(revision.blameCommits)
+        heatColors = self.heatColorsForRevision(revision)
 
         for block, top, bottom in self.paintBlocks(event, painter, self.lineColor):
             lineNumber = 1 + block.blockNumber()
-            try:
-                annotatedLine = revision.blameLines[lineNumber]
-                lineCommitId = annotatedLine.commitId
-            except IndexError:
+            if lineNumber >= lineCount:
                 break
 
-            if lineCommitId != hunkCommitId:
-                hunkCommitId = lineCommitId
-                hunkStartLine = lineNumber
-                isCurrent = lineCommitId == topCommitId
-                painter.setFont(self.boldFont if isCurrent else self.font())
-                painter.setPen(boldTextPen if isCurrent else textPen)
-
+            if hunk < 0 or lineNumber >= nextHunkStartLine:
+                hunk = revision.hunkAt(lineNumber)
+                hunkStartLine = revision.hunkStarts[hunk]
                 try:
-                    revisionNumber = self.model.revList.revisionNumber(lineCommitId)
-                except LookupError:
-                    revisionNumber = -1
+                    nextHunkStartLine = revision.hunkStarts[hunk + 1]
+                except IndexError:
+                    nextHunkStartLine = lineCount
 
-                # Compute heat color
-                if revisionNumber == topRevisionNumber:
-                    bgColor = self.freshColor
-                elif revisionNumber == -1:
-                    bgColor = self.unknownColor
+                lineCommitKey = revision.blameCommits[lineNumber]
+                if lineCommitKey == Revision.PendingKey:
+                    lineCommitId = None
                 else:
-                    heat = revisionNumber / (topRevisionNumber - 1)
-                    heat = heat ** 2  # ease in cubic
-                    bgColor = self.heatColor
-                    bgColor.setAlphaF(lerp(.0, .6, heat))
+                    lineCommitId = revList.commitForKey(lineCommitKey)
+                isCurrent = lineCommitId == topCommitId
+                painter.setFont(self.boldFont if isCurrent else self.font())
+                painter.setPen(boldTextPen if isCurrent else textPen)
+                bgColor = heatColors[hunk]
 
             # Fill heat rectangle
             heatTop = top if lastCaptionDrawnAtLine >= 0 else 0
@@ -163,7 +165,8 @@ class BlameGutter(CodeGutter):
 
             # Draw caption + separator line
             if lastCaptionDrawnAtLine < hunkStartLine:
-                self.drawBlameCaption(lineCommitId, painter, top, lh)
+                if lineCommitId is not None:  # Leave pending hunks blank
+                    self.drawBlameCaption(lineCommitId, painter, top, lh)
 
                 # Hunk separator line
                 if lastCaptionDrawnAtLine > 0:
@@ -176,6 +179,40 @@ class BlameGutter(CodeGutter):
 
         painter.end()
 
+    def heatColorsForRevision(self, revision: Revision) -> list[QColor]:
+        """
+        Return the background color of each hunk in the given revision.
+        Colors are computed once per revision (and per color scheme).
+        """
+        if self.heatColorsSource is revision.hunkRevisionNumbers:
+            return self.heatColorsCache
+
+        topRevisionNumber = self.model.revList.revisionNumber(revision.commitId)
+        colorsByRevisionNumber: dict[int, QColor] = {}
+        heatColors = []
+
+        for revisionNumber in revision.hunkRevisionNumbers:
+            try:
+                color = colorsByRevisionNumber[revisionNumber]
+            except KeyError:
+                if revisionNumber == topRevisionNumber:
+                    color = self.freshColor
+                elif revisionNumber == 0:
+                    color = QColor(Qt.GlobalColor.transparent)
+                elif revisionNumber == -1:
+                    color = self.unknownColor
+                else:
+                    heat = revisionNumber / (topRevisionNumber - 1)
+                    heat = heat ** 2  # ease in cubic
+                    color = QColor(self.heatColor)
+                    color.setAlphaF(lerp(.0, .6, heat))
+                colorsByRevisionNumber[revisionNumber] = color
+            heatColors.append(color)
+
+        self.heatColorsCache = heatColors
+        self.heatColorsSource = revision.hunkRevisionNumbers
+        return heatColors
+
     def drawBlameCaption(self, commitId: Oid, painter: QPainter, top: int, lh: int):
         alignLeft = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
         dateL, dateW = self.columnMetrics[0]
@@ -205,10 +242,15 @@ class BlameGutter(CodeGutter):
         lineNumber = 1 + textCursor.blockNumber()
 
         try:
-            commitId = self.model.currentRevision.blameLines[lineNumber].commitId
+            commitKey = self.model.currentRevision.blameCommits[lineNumber]
         except LookupError:
             return False
 
+        if commitKey == Revision.PendingKey:
+            return False
+
+        commitId = self.model.revList.commitForKey(commitKey)
+
         try:
             revision = self.model.revList.revisionForCommit(commitId)
             revisionNumber = self.model.revList.revisionNumber(commitId)
@@ -8,6 +8,9 @@ from __future__ import annotations
 
 import dataclasses
 import os
+from array import array
+from bisect import bisect_right
+from typing import ClassVar
 
 from gitfourchette.gitdriver import GitStatus
 from gitfourchette.graph import Graph, GraphWeaver
@@ -58,26 +61,48 @@ class BlameModel:
         return self.repoModel.repo
 
 
+def _intArray() -> array:
+    return array("i")
+
+
 @dataclasses.dataclass
 class Revision:
     """
     State of a file at a specific commit.
     Each line is annotated with the commit it originates from.
-    """
 
-    @dataclasses.dataclass(frozen=True)
-    class BlameLine:
-        commitId: Oid
-        "Commit where this line appeared first."
+    Blame data is stored in parallel int arrays indexed by line number
+    (line #0 is a dummy so that effective numbering can start at 1).
+    Commits are referred to by their key in the RevList (see RevList.commitKey).
+    While git blame is running, lines that haven't been blamed yet have
+    PendingKey as their commit key.
+    """
 
-        originalLineNumber: int
-        "Line number in the original file in the source commit."
+    PendingKey: ClassVar[int] = -1
 
     path: str
     commitId: Oid
     parentIds: list[Oid] = dataclasses.field(default_factory=list)
     status: GitStatus = GitStatus.Modified
-    blameLines: list[BlameLine] = dataclasses.field(default_factory=list)
+
+    blameCommits: array = dataclasses.field(default_factory=_intArray)
+    "For each line, key of the commit where this line appeared first."
+
+    blameOrigins: array = dataclasses.field(default_factory=_intArray)
+    "For each line, line number in the original file in the source commit."
+
+    hunkStarts: array = dataclasses.field(default_factory=_intArray)
+    "First line number of each run of consecutive lines coming from the same commit."
+
+    hunkRevisionNumbers: array = dataclasses.field(default_factory=_intArray)
+    """
+    For each hunk, revision number of the source commit
+    (-1 if it's missing from the RevList; 0 if the hunk is still pending).
+    """
+
+    blameComplete: bool = False
+    "True once git blame has finished annotating every line."
+
     fullText: str | None = None
     binary: bool = False
 
@@ -88,13 +113,69 @@ class Revision:
             return NavLocator.inCommit(self.commitId, self.path)
 
     def isAnnotated(self) -> bool:
-        return bool(self.blameLines)
-
-    def findLine(self, target: BlameLine, start: int, searchRange: int = 250) -> int:
-        assert self.isAnnotated()
-
-        lines = self.blameLines
-        count = len(lines)
+        return self.blameComplete
+
+    def beginAnnotation(self, lineCount: int, dummyKey: int):
+        """
+        Reset blame data to lineCount pending lines (plus dummy line #0).
+        """
+        self.blameCommits = array("i", [dummyKey]) + array("i", [Revision.PendingKey]) * lineCount
+        self.blameOrigins = array("i", [0]) * (lineCount + 1)
+        self.blameComplete = False
+
+    def annotateLines(self, commitKey: int, originalLineNumber: int, lineNumber: int, count: int):
+        """
+        Attribute `count` lines starting at lineNumber to the given commit.
+        """
+        end = lineNumber + count
+        shortfall = end - len(self.blameCommits)
+        if shortfall > 0:  # Be lenient if git disagrees with our line count
+            self.blameCommits.extend([Revision.PendingKey] * shortfall)
+            self.blameOrigins.extend([0] * shortfall)
+
+        self.blameCommits[lineNumber: end] = array("i", [commitKey]) * count
+        self.blameOrigins[lineNumber: end] = array("i", range(originalLineNumber, originalLineNumber + count))
+
+    def lineIdentity(self, lineNumber: int) -> tuple[int, int]:
+        """
+        Identify a line by its source commit and its line number in the source
+        commit. This can be used to find the same line in another revision.
+        """
+        return self.blameCommits[lineNumber], self.blameOrigins[lineNumber]
+
+    def indexHunks(self, revList: RevList):
+        """
+        Precompute hunk boundaries and heat (revision numbers) so that the
+        gutter doesn't need to look up each line's commit on every paint.
+        """
+        starts = _intArray()
+        revisionNumbers = _intArray()
+        previousKey = None
+
+        for lineNumber, key in enumerate(self.blameCommits):
+            if lineNumber == 0 or key == previousKey:
+                continue
+            previousKey = key
+            starts.append(lineNumber)
+            if key == Revision.PendingKey:
+                revisionNumbers.append(0)
+            else:
+                revisionNumbers.append(revList.revisionNumberForKey(key))
+
+        self.hunkStarts = starts
+        self.hunkRevisionNumbers = revisionNumbers
+
+    def hunkAt(self, lineNumber: int) -> int:
+        """ Return the index of the hunk containing the given line number. """
+        return bisect_right(self.hunkStarts, lineNumber) - 1
+
+    def findLine(self, target: tuple[int, int], start: int, searchRange: int = 250) -> int:
+        assert self.blameCommits
+
+        commits = self.blameCommits
+        origins = self.blameOrigins
+        targetCommit, targetOrigin = target
+        count = len(commits)
         start = min(start, count - 1)
         searchRange = min(searchRange, count)
 
@@ -102,9 +183,9 @@ class Revision:
         hi = start + 1
 
         for _i in range(searchRange):
-            if lo >= 0 and lines[lo] == target:
+            if lo >= 0 and commits[lo] == targetCommit and origins[lo] == targetOrigin:
                 return lo
-            if hi < count and lines[hi] == target:
+            if hi < count and commits[hi] == targetCommit and origins[hi] == targetOrigin:
                 return hi
             lo -= 1
             hi += 1
@@ -122,18 +203,31 @@ class RevList:
     byCommit: dict[Oid, Revision]
     nonTipCommits: set[Oid]
 
+    commitKeys: dict[Oid, int]
+    "Compact integer keys for the commits referenced by blame data."
+
+    keyedCommits: list[Oid]
+    "Reverse lookup for commitKeys."
+
+    _revisionNumbers: dict[Oid, int]
+
     def __init__(self):
         self.sequence = []
         self.byCommit = {}
         self.nonTipCommits = set()
+        self.commitKeys = {}
+        self.keyedCommits = []
+        self._revisionNumbers = {}
 
     def insert(self, index: int, revision: Revision):
         self.sequence.insert(index, revision)
         self.byCommit[revision.commitId] = revision
+        self._revisionNumbers.clear()
 
     def push(self, revision: Revision):
         self.sequence.append(revision)
         self.byCommit[revision.commitId] = revision
+        self._revisionNumbers.clear()
 
     def __len__(self) -> int:
         return len(self.sequence)
@@ -142,9 +236,30 @@ class RevList:
         return self.byCommit[oid]
 
     def revisionNumber(self, oid: Oid) -> int:
-        revision = self.byCommit[oid]
-        index = self.sequence.index(revision)
-        return len(self.sequence) - index
+        numbers = self._revisionNumbers
+        if not numbers:
+            count = len(self.sequence)
+            numbers.update((revision.commitId, count - i) for i, revision in enumerate(self.sequence))
+        return numbers[oid]
+
+    def commitKey(self, oid: Oid) -> int:
+        """ Return a compact integer key for the given commit (assigning a new key if needed). """
+        try:
+            return self.commitKeys[oid]
+        except KeyError:
+            key = len(self.keyedCommits)
+            self.commitKeys[oid] = key
+            self.keyedCommits.append(oid)
+            return key
+
+    def commitForKey(self, key: int) -> Oid:
+        return self.keyedCommits[key]
+
+    def revisionNumberForKey(self, key: int) -> int:
+        try:
+            return self.revisionNumber(self.keyedCommits[key])
+        except LookupError:
+            return -1
 
     def serializeRevisionList(self) -> str:
         """ Serialize the file's commit history (including parent rewriting)
@@ -28,9 +28,14 @@ class BlameTextEdit(CodeView):
 
     def contextMenuActions(self, clickedCursor: QTextCursor):
         lineNumber = clickedCursor.blockNumber() + 1
-        lineNumber = min(lineNumber, len(self.model.currentRevision.blameLines) - 1)
+        currentRevision = self.model.currentRevision
+        lineNumber = min(lineNumber, len(currentRevision.blameCommits) - 1)
 
-        commitId = self.model.currentRevision.blameLines[lineNumber].commitId
+        commitKey = currentRevision.blameCommits[lineNumber]
+        if commitKey == Revision.PendingKey:  # 'git blame' hasn't got to this line yet
+            return []
+
+        commitId = self.model.revList.commitForKey(commitKey)
         try:
             revision = self.model.revList.revisionForCommit(commitId)
             locator = revision.toLocator()
@@ -25,7 +25,12 @@ class CodeSearch(SearchProvider):
         self._buddy.highlighter.setSearchTerm("")
 
     def _termChanged(self):
-        numOccurrences = self._buddy.highlighter.setSearchTerm(self._term)
+        highlighter = self._buddy.highlighter
+        numOccurrences = highlighter.setSearchTerm(self._term)
+
+        # No highlighter on this document (e.g. lean diff): count occurrences ourselves
+        if self._term and highlighter.document() is None:
+            numOccurrences = self._buddy.toPlainText().lower().count(self._term)
 
         if not self._term:  # Empty
             self.setStatus(SearchProvider.TermStatus.Unknown)
@@ -187,6 +187,16 @@ class DiffDocument:
     oldLexJob: LexJob | None = None
     newLexJob: LexJob | None = None
 
+    lean: bool = False
+    """
+    Lean documents skip per-line block formats, intraline (doppelganger)
+    highlighting and syntax highlighting. DiffView paints the +/- line
+    backgrounds of the visible window itself.
+    """
+
+    LeanLineThreshold = 100_000
+    "Patches with more lines than this are loaded as lean documents."
+
     class VeryLongLinesError(ValueError):
         pass
 
@@ -315,18 +325,23 @@ class DiffDocument:
         diffDocument = DiffDocument(document=textDocument, lineData=lineData,
                                     pluses=pluses, minuses=minuses,
                                     maxLine=max(newLine, oldLine),
-                                    oldHash=oldHash, newHash=newHash)
+                                    oldHash=oldHash, newHash=newHash,
+                                    lean=len(lineData) > DiffDocument.LeanLineThreshold)
 
         # Begin batching text insertions for performance.
         # This prevents Qt from recomputing the document's layout after every line insertion.
         cursor = QTextCursor(textDocument)
         cursor.beginEditBlock()
 
-        # Build up document from the lineData array.
-        diffDocument.buildTextDocument(cursor)
+        if diffDocument.lean:
+            # Huge patch: insert the whole text in one go.
+            diffDocument.buildLeanTextDocument(cursor)
+        else:
+            # Build up document from the lineData array.
+            diffDocument.buildTextDocument(cursor)
 
-        # Emphasize doppelganger differences.
-        diffDocument.formatDoppelgangerDiffs(cursor)
+            # Emphasize doppelganger differences.
+            diffDocument.formatDoppelgangerDiffs(cursor)
 
         # Done batching text insertions.
         cursor.endEditBlock()
@@ -358,21 +373,7 @@ class DiffDocument:
                 bf = defaultBF
                 cf = defaultCF
 
-            # Process line ending
-            trailer = ""
-            if ld.text.endswith('\r\n'):
-                trimBack = -2
-                if showStrayCRs:
-                    trailer = "<CRLF>"
-            elif ld.text.endswith('\n'):
-                trimBack = -1
-            elif ld.text.endswith('\r'):
-                trimBack = -1
-                if showStrayCRs:
-                    trailer = "<CR>"
-            else:
-                trailer = _("<no newline at end of file>")
-                trimBack = None  # yes, None. This will cancel slicing.
+            text, trailer = _splitLineEnding(ld.text, showStrayCRs)
 
             if isEmpty:
                 ld.cursorStart = 0
@@ -382,7 +383,7 @@ class DiffDocument:
 
             cursor.setBlockFormat(bf)
             cursor.setBlockCharFormat(cf)
-            cursor.insertText(ld.text[:trimBack])
+            cursor.insertText(text)
 
             if trailer:
                 ld.trailerLength = len(trailer)
@@ -392,6 +393,59 @@ class DiffDocument:
             ld.cursorEnd = cursor.position()
             isEmpty = False
 
+    @benchmark
+    def buildLeanTextDocument(self, cursor: QTextCursor):
+        assert self.document.isEmpty()
+
+        showStrayCRs = settings.prefs.showStrayCRs
+        parts = []
+        formatRuns = []
+        position = 0
+
+        # Work out cursor positions (in UTF-16 code units!) without asking Qt
+        for ld in self.lineData:
+            text, trailer = _splitLineEnding(ld.text, showStrayCRs)
+            textLength = len(text) if text.isascii() else qstringLength(text)
+
+            ld.cursorStart = position
+            position += textLength
+
+            if not ld.origin:
+                formatRuns.append((ld.cursorStart, position, DiffTextFormats.hunkCF))
+
+            if trailer:
+                ld.trailerLength = len(trailer)
+                formatRuns.append((position, position + ld.trailerLength, DiffTextFormats.warningCF))
+                position += ld.trailerLength
+                text += trailer
+
+            ld.cursorEnd = position
+            position += 1  # Block separator
+            parts.append(text)
+
+        cursor.insertText("\n".join(parts))
+
+        # Format the few spans that need it (hunk headers, line ending warnings)
+        for start, end, charFormat in formatRuns:
+            cursor.setPosition(start, QTextCursor.MoveMode.MoveAnchor)
+            cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+            cursor.setCharFormat(charFormat)
+
+    def lineBackground(self, blockNumber: int) -> QBrush | None:
+        """
+        Background brush for a line in a lean document (None for context lines).
+        """
+        try:
+            origin = self.lineData[blockNumber].origin
+        except IndexError:
+            return None
+        if origin == "+":
+            return DiffTextFormats.addBF.background()
+        elif origin == "-":
+            return DiffTextFormats.delBF.background()
+        else:
+            return None
+
     @benchmark
     def formatDoppelgangerDiffs(self, cursor: QTextCursor):
         if self.pluses == 0 or self.minuses == 0:  # Don't bother if there can't be any doppelgangers
@@ -440,6 +494,21 @@ class DiffDocument:
         assert not doppelgangerBlocksQueue, "should've consumed all doppelganger matching blocks!"
 
 
+def _splitLineEnding(text: str, showStrayCRs: bool) -> tuple[str, str]:
+    """
+    Strip the line ending from a line of the patch.
+    Return the visible text and a trailer (e.g. "<CRLF>") to append to it.
+    """
+    if text.endswith('\r\n'):
+        return text[:-2], "<CRLF>" if showStrayCRs else ""
+    elif text.endswith('\n'):
+        return text[:-1], ""
+    elif text.endswith('\r'):
+        return text[:-1], "<CR>" if showStrayCRs else ""
+    else:
+        return text, _("<no newline at end of file>")
+
+
 def _invertMatchingBlocks(blockList: list[difflib.Match], useA: bool) -> Iterator[tuple[int, int]]:
     px = 0
 
@@ -26,7 +26,12 @@ class DiffHighlighter(CodeHighlighter):
 
     def setDiffDocument(self, diffDocument: DiffDocument):
         self.diffDocument = diffDocument
-        self.setDocument(diffDocument.document)
+
+        # Don't run the highlighter over every single line of a lean document
+        if diffDocument.lean:
+            self.setDocument(None)
+        else:
+            self.setDocument(diffDocument.document)
 
         # Prime lex jobs
         self.stopLexJobs()
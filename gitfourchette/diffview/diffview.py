@@ -109,6 +109,29 @@ class DiffView(CodeView):
         else:
             QApplication.beep()
 
+    def paintEvent(self, event: QPaintEvent):
+        # Lean documents have no block formats, so paint the +/- line
+        # backgrounds ourselves - only for the lines that are visible.
+        diffDocument = self.currentDiffDocument
+        if (diffDocument is not None
+                and diffDocument.lean
+                and self.document().blockCount() == len(diffDocument.lineData)):
+            painter = QPainter(self.viewport())
+            paintRect = event.rect()
+            offset = self.contentOffset()
+            block = self.firstVisibleBlock()
+            while block.isValid():
+                rect = self.blockBoundingGeometry(block).translated(offset)
+                if rect.top() > paintRect.bottom():
+                    break
+                brush = diffDocument.lineBackground(block.blockNumber())
+                if brush is not None:
+                    painter.fillRect(QRectF(paintRect.left(), rect.top(), paintRect.width(), rect.height()), brush)
+                block = block.next()
+            painter.end()
+
+        super().paintEvent(event)
+
     def mouseReleaseEvent(self, event: QMouseEvent):
         super().mouseReleaseEvent(event)
         if event.button() == Qt.MouseButton.MiddleButton:
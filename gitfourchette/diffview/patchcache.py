@@ -0,0 +1,132 @@
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Iliyas Jorio.
+# This file is part of GitFourchette, distributed under the GNU GPL v3.
+# For full terms, see the included LICENSE file.
+# -----------------------------------------------------------------------------
+
+import dataclasses
+import logging
+
+from gitfourchette.diffview.diffdocument import DiffDocument
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class PatchCacheEntry:
+    patch: str
+    "Raw output of 'git diff' for this file."
+
+    isWorkdir: bool
+    "True if the patch involves the working directory or the index."
+
+    document: DiffDocument | None = None
+    """
+    DiffDocument built ahead of time by a prefetcher, waiting to be displayed.
+    DiffView takes ownership of the documents it displays (and deletes them
+    when it moves on), so a document can only be handed out once.
+    """
+
+
+class PatchCache:
+    """
+    LRU cache of 'git diff' output for individual files, so that going back
+    and forth between files doesn't have to spawn a git process every time.
+    Also holds DiffDocuments that were prefetched in the background.
+    """
+
+    MaxBudget = 8 * 1024 * 1024
+    """
+    Maximum total length, in characters, of all cached patches.
+    """
+
+    KeyType = tuple
+
+    cache: dict[KeyType, PatchCacheEntry]
+    totalSize: int
+
+    def __init__(self):
+        self.cache = {}
+        self.totalSize = 0
+
+    def put(self, key: KeyType, patch: str, isWorkdir: bool):
+        try:
+            entry = self.cache[key]
+            entry.patch = patch
+            self.bump(key)
+            return
+        except KeyError:
+            pass
+
+        size = len(patch)
+
+        # If the patch is larger than the cache capacity, just bail
+        if size > self.MaxBudget:
+            logger.debug("Patch too large to fit in cache")
+            return
+
+        # Make room, least recently used first
+        keys = list(self.cache)
+        while self.totalSize + size > self.MaxBudget:
+            self.evict(keys.pop(0))
+
+        self.cache[key] = PatchCacheEntry(patch, isWorkdir)
+        self.totalSize += size
+
+    def putDocument(self, key: KeyType, document: DiffDocument):
+        try:
+            entry = self.cache[key]
+        except KeyError:
+            # Patch didn't fit in the cache
+            return
+        self.discardDocument(entry)
+        entry.document = document
+
+    def get(self, key: KeyType) -> PatchCacheEntry:
+        entry = self.cache[key]
+        self.bump(key)
+        return entry
+
+    def takeDocument(self, key: KeyType) -> DiffDocument | None:
+        """
+        Return the prefetched DiffDocument for this key (if any).
+        The caller becomes the owner of the document.
+        """
+        try:
+            entry = self.get(key)
+        except KeyError:
+            return None
+        document = entry.document
+        entry.document = None
+        return document
+
+
+    def bump(self, key: KeyType):
+        self.cache[key] = self.cache.pop(key)
+
+    def evict(self, key: KeyType):
+        entry = self.cache.pop(key)
+        self.totalSize -= len(entry.patch)
+        self.discardDocument(entry)
+
+    def evictWorkdir(self):
+        """
+        Drop all patches that involve the working directory or the index.
+        """
+        for key in [k for k, entry in self.cache.items() if entry.isWorkdir]:
+            self.evict(key)
+
+    def clear(self):
+        for entry in self.cache.values():
+            self.discardDocument(entry)
+        self.cache.clear()
+        self.totalSize = 0
+
+    @staticmethod
+    def discardDocument(entry: PatchCacheEntry):
+        if entry.document is not None:
+            entry.document.document.deleteLater()
+            entry.document = None
+
+    def __contains__(self, key: KeyType) -> bool:
+        return key in self.cache
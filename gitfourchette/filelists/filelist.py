@@ -593,6 +593,18 @@ class FileList(QListView):
         row = self.flModel.getRowForFile(file)
         return self.flModel.deltas[row]
 
+    def neighborDeltas(self, file: str) -> list[GitDelta]:
+        """
+        Return the deltas listed right below and right above the given file
+        (in that order).
+        """
+        try:
+            row = self.flModel.getRowForFile(file)
+        except KeyError:
+            return []
+        deltas = self.flModel.deltas
+        return [deltas[r] for r in (row + 1, row - 1) if 0 <= r < len(deltas)]
+
     def openHeadRevision(self):
         def run(task: RepoTask, delta: GitDelta):
             fakeHeadFile = GitDeltaFile(delta.old.path, HexHashFFFF, source=GitDeltaSource.Commit, sourceCommit=self.repo.head_commit_id)
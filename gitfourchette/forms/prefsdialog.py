@@ -415,6 +415,8 @@ class PrefsDialog(QDialog):
             control = self.boundedIntControl(key, value, 0, 999_999)
             control.setSpecialValueText("\u221E")  # infinity
             return control
+        elif key == "maxTrashMB":
+            return self.boundedIntControl(key, value, 0, 999_999)
         elif key == "gitPath":
             presets = {}
             builtInGit = ToolPresets.flatpakBuiltInGit()
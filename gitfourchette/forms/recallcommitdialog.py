@@ -0,0 +1,76 @@
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Iliyas Jorio.
+# This file is part of GitFourchette, distributed under the GNU GPL v3.
+# For full terms, see the included LICENSE file.
+# -----------------------------------------------------------------------------
+
+from gitfourchette.forms.textinputdialog import TextInputDialog
+from gitfourchette.localization import *
+from gitfourchette.lostcommits import LostCommitIndex
+from gitfourchette.qt import *
+from gitfourchette.toolbox import *
+
+
+class RecallCommitDialog(TextInputDialog):
+    """
+    Prompt for a commit hash, with a searchable list of lost commits
+    (reflog-only and dangling commits) to pick from.
+    """
+
+    MaxVisibleItems = 500
+
+    def __init__(self, parent: QWidget, index: LostCommitIndex):
+        super().__init__(
+            parent,
+            _("Recall lost commit"),
+            _("If you know the hash of a commit that isn’t part of any branches anymore, "
+              "{app} will try to recall it for you.", app=qAppName()))
+
+        self.index = index
+        self.okButton.setText(_("Recall"))
+        self.lineEdit.setPlaceholderText(_("Commit hash or message"))
+
+        tree = QTreeWidget(self)
+        tree.setObjectName("LostCommitList")
+        tree.setRootIsDecorated(False)
+        tree.setUniformRowHeights(True)
+        tree.setHeaderLabels([_("Commit"), _("Date"), _("Message")])
+        tree.setMinimumHeight(240)
+        tree.itemClicked.connect(self.onItemClicked)
+        tree.itemDoubleClicked.connect(self.onItemDoubleClicked)
+        self.tree = tree
+        self.setExtraWidget(tree)
+
+        self.lineEdit.textEdited.connect(self.refill)
+        self.refill()
+
+    def show(self):
+        # Skip TextInputDialog's height lock so that the list can be resized
+        QDialog.show(self)
+
+    def refill(self):
+        tree = self.tree
+        tree.clear()
+
+        lostCommits = self.index.filter(self.lineEdit.text())
+        locale = QLocale()
+
+        items = []
+        for lost in lostCommits[:self.MaxVisibleItems]:
+            date = locale.toString(QDateTime.fromSecsSinceEpoch(lost.time), QLocale.FormatType.ShortFormat)
+            item = QTreeWidgetItem([shortHash(lost.id), date, lost.summary])
+            item.setData(0, Qt.ItemDataRole.UserRole, str(lost.id))
+            if lost.reflogMessage:
+                item.setToolTip(2, _("Reflog: {0}", lost.reflogMessage))
+            items.append(item)
+        tree.addTopLevelItems(items)
+
+        for column in range(2):
+            tree.resizeColumnToContents(column)
+
+    def onItemClicked(self, item: QTreeWidgetItem):
+        self.lineEdit.setText(item.data(0, Qt.ItemDataRole.UserRole))
+
+    def onItemDoubleClicked(self, item: QTreeWidgetItem):
+        self.onItemClicked(item)
+        self.accept()
@@ -97,6 +97,11 @@ class StatusForm(QWidget):
             process.progressMessage.connect(self.setProgressMessage)
             process.progressFraction.connect(self.setProgressValue)
 
+            if process.batchProgress:
+                text, num, denom = process.batchProgress
+                self.setProgressMessage(text)
+                self.setProgressValue(num, denom)
+
     def onProcessLost(self):
         process = self.processConnection.process
         assert process is not None
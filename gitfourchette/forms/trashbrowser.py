@@ -0,0 +1,148 @@
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Iliyas Jorio.
+# This file is part of GitFourchette, distributed under the GNU GPL v3.
+# For full terms, see the included LICENSE file.
+# -----------------------------------------------------------------------------
+
+from pathlib import Path
+
+from gitfourchette.localization import *
+from gitfourchette.qt import *
+from gitfourchette.toolbox import *
+from gitfourchette.trash import Trash, TrashEntry, TrashItem, TrashItemKind
+
+
+class TrashBrowser(QDialog):
+    """
+    Lists the changes kept in the trash, and lets the user restore them
+    to their original location or save them elsewhere.
+    """
+
+    def __init__(self, parent: QWidget, trash: Trash):
+        super().__init__(parent)
+        self.trash = trash
+
+        self.setWindowTitle(_("Trash"))
+        self.setObjectName("TrashBrowser")
+
+        tree = QTreeWidget(self)
+        tree.setUniformRowHeights(True)
+        tree.setHeaderLabels([_("Discarded"), _("Repository"), _("File"), _("Size")])
+        tree.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        tree.setMinimumSize(640, 320)
+        tree.currentItemChanged.connect(self.syncButtons)
+        self.tree = tree
+
+        self.summaryLabel = QLabel(self)
+
+        buttonBox = QDialogButtonBox(QDialogButtonBox.StandardButton.Close, self)
+        self.restoreButton = buttonBox.addButton(_("Restore"), QDialogButtonBox.ButtonRole.ActionRole)
+        self.saveAsButton = buttonBox.addButton(_("Save As…"), QDialogButtonBox.ButtonRole.ActionRole)
+        self.showFolderButton = buttonBox.addButton(_("Show Folder"), QDialogButtonBox.ButtonRole.HelpRole)
+        self.restoreButton.clicked.connect(self.onRestore)
+        self.saveAsButton.clicked.connect(self.onSaveAs)
+        self.showFolderButton.clicked.connect(lambda: openFolder(str(self.trash.trashDir)))
+        buttonBox.rejected.connect(self.reject)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(tree)
+        layout.addWidget(self.summaryLabel)
+        layout.addWidget(buttonBox)
+
+        self.refill()
+
+    def refill(self):
+        tree = self.tree
+        tree.clear()
+        locale = QLocale()
+
+        for entry in self.trash.entries:
+            date = locale.toString(QDateTime.fromSecsSinceEpoch(entry.time), QLocale.FormatType.ShortFormat)
+            repoName = Path(entry.workdir).name
+
+            if len(entry.items) == 1:
+                item = entry.items[0]
+                row = QTreeWidgetItem([date, repoName, self.itemCaption(item), locale.formattedDataSize(item.size, 1)])
+                row.setData(0, Qt.ItemDataRole.UserRole, (entry, item))
+            else:
+                totalSize = sum(item.size for item in entry.items)
+                caption = _n("{n} file", "{n} files", len(entry.items))
+                row = QTreeWidgetItem([date, repoName, caption, locale.formattedDataSize(totalSize, 1)])
+                row.setData(0, Qt.ItemDataRole.UserRole, (entry, None))
+                for item in entry.items:
+                    child = QTreeWidgetItem(["", "", self.itemCaption(item), locale.formattedDataSize(item.size, 1)])
+                    child.setData(0, Qt.ItemDataRole.UserRole, (entry, item))
+                    row.addChild(child)
+
+            row.setToolTip(1, entry.workdir)
+            tree.addTopLevelItem(row)
+
+        for column in range(2):
+            tree.resizeColumnToContents(column)
+
+        sizeOnDisk, entryCount = self.trash.size()
+        self.summaryLabel.setText(_n(
+            "{n} discarded change, taking up {size} on disk.",
+            "{n} discarded changes, taking up {size} on disk.",
+            n=entryCount, size=locale.formattedDataSize(sizeOnDisk, 1)))
+
+        self.syncButtons()
+
+    @staticmethod
+    def itemCaption(item: TrashItem) -> str:
+        if item.kind == TrashItemKind.Patch:
+            return _("{0} (patch)", item.path)
+        elif item.kind == TrashItemKind.Tarball:
+            return _("{0} (folder)", item.path)
+        elif item.kind == TrashItemKind.Symlink:
+            return _("{0} (symlink)", item.path)
+        return item.path
+
+    def selection(self) -> tuple[TrashEntry, TrashItem | None] | tuple[None, None]:
+        row = self.tree.currentItem()
+        if row is None:
+            return None, None
+        return row.data(0, Qt.ItemDataRole.UserRole)
+
+    def syncButtons(self):
+        _entry, item = self.selection()
+        canRestore = item is not None and item.kind in (TrashItemKind.File, TrashItemKind.Symlink, TrashItemKind.Tarball)
+        self.restoreButton.setEnabled(canRestore)
+        self.saveAsButton.setEnabled(item is not None and item.kind != TrashItemKind.Symlink)
+
+    def onRestore(self):
+        entry, item = self.selection()
+        assert entry is not None and item is not None
+
+        if item.kind == TrashItemKind.Tarball:
+            destination = Path(entry.workdir)
+            target = Path(entry.workdir, item.path)
+        else:
+            destination = target = Path(entry.workdir, item.path)
+
+        def restore():
+            try:
+                self.trash.restore(item, destination)
+            except OSError as exc:
+                excMessageBox(exc, _("Restore"), _("Couldn’t restore {0}.", bquo(item.path)), parent=self)
+
+        if target.exists() or target.is_symlink():
+            askConfirmation(
+                self, _("Restore"),
+                paragraphs(_("{0} already exists in {1}.", bquo(item.path), bquo(entry.workdir)),
+                           _("Do you want to overwrite it?")),
+                callback=restore)
+        else:
+            restore()
+
+    def onSaveAs(self):
+        _entry, item = self.selection()
+        assert item is not None
+
+        if item.kind == TrashItemKind.Tarball:
+            qfd = PersistentFileDialog.openDirectory(self, "SaveFile", _("Extract {0} into", item.path))
+            qfd.fileSelected.connect(lambda path: self.trash.restore(item, Path(path)))
+        else:
+            qfd = PersistentFileDialog.saveFile(self, "SaveFile", _("Save {0} as", item.path), item.suggestedFileName())
+            qfd.fileSelected.connect(lambda path: self.trash.restore(item, Path(path)))
+        qfd.show()
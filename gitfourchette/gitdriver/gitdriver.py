@@ -54,6 +54,12 @@ class GitDriver(QProcess):
     _cachedLfsVersionValid  : ClassVar[bool] = False
     _cachedLfsVersion       : ClassVar[str] = ""
 
+    DiffBatchMaxPathspecBytes = 16_000
+    "Stay well under the command line length limit (32767 characters on Windows)."
+
+    DiffBatchMaxDeltas = 250
+    "Cap the number of files per `git diff` so that progress is reported regularly."
+
     progressMessage = Signal(str)
     progressFraction = Signal(int, int)
 
@@ -168,6 +174,11 @@ class GitDriver(QProcess):
         self.readyReadStandardError.connect(self._onReadyReadStandardError)
         self._stderrScrollback = io.BytesIO()
         self._stdout: str | None = None
+        self.batchProgress: tuple[str, int, int] | None = None
+        """
+        Progress of a multi-process operation that this process is a part of,
+        for display in a StatusForm (text, num, denom).
+        """
 
     def stdoutTable(self, pattern: str, linesep="\n", strict=True) -> list:
         stdout = self.stdoutScrollback()
@@ -341,14 +352,8 @@ class GitDriver(QProcess):
         ]
 
         if isinstance(delta, GitDelta):
-            if delta.source == GitDeltaSource.Index:
-                tokens.append("--staged")
-            elif delta.source == GitDeltaSource.Commit:
-                # Append treeishes being compared
-                assert delta.new.sourceCommit
-                compareB = delta.new.sourceCommit
-                compareA = delta.old.sourceCommit or EMPTYTREE_OID  # emptytree if root commit
-                tokens += [str(compareA), str(compareB)]
+            # Append treeishes being compared
+            tokens += cls._diffTargetTokens(delta)
 
             # Append paths
             if delta.status == GitStatus.Untracked:  # untracked, compare to nothing
@@ -371,6 +376,80 @@ class GitDriver(QProcess):
 
         return tokens
 
+    @classmethod
+    def _diffTargetTokens(cls, delta: GitDelta) -> list[str]:
+        if delta.source == GitDeltaSource.Index:
+            return ["--staged"]
+        elif delta.source == GitDeltaSource.Commit:
+            assert delta.new.sourceCommit
+            compareB = delta.new.sourceCommit
+            compareA = delta.old.sourceCommit or EMPTYTREE_OID  # emptytree if root commit
+            return [str(compareA), str(compareB)]
+        else:
+            return []
+
+    @classmethod
+    def buildDiffCommandBatches(cls, deltas: list[GitDelta], binary=True) -> list[tuple[list[str], int]]:
+        """
+        Cover the given deltas with as few `git diff` invocations as possible.
+
+        Deltas that compare the same pair of trees share a single command with
+        a list of pathspecs. (`git diff` doesn't support --pathspec-from-file,
+        so long pathspec lists are chunked to stay under command line length
+        limits.) Untracked files each require their own `git diff --no-index`.
+
+        Returns a list of (tokens, number of deltas covered by the command).
+        """
+        groups: dict[tuple[str, ...], list[GitDelta]] = {}
+        untracked: list[GitDelta] = []
+
+        for delta in deltas:
+            if delta.status == GitStatus.Untracked:
+                untracked.append(delta)
+            else:
+                target = tuple(cls._diffTargetTokens(delta))
+                groups.setdefault(target, []).append(delta)
+
+        batches: list[tuple[list[str], int]] = []
+
+        for target, group in groups.items():
+            stem = [
+                # Paths are not glob patterns
+                "--literal-pathspecs",
+                *cls.buildDiffCommand(None, binary),
+                *target,
+                "--",
+            ]
+            paths: list[str] = []
+            pathBytes = 0
+            numDeltas = 0
+
+            for delta in group:
+                # Both sides of a rename must be in the pathspec for git to pair them up
+                deltaPaths = [delta.new.path]
+                if delta.old.path != delta.new.path:
+                    deltaPaths.insert(0, delta.old.path)
+                deltaBytes = sum(len(p.encode("utf-8")) + 1 for p in deltaPaths)
+
+                if numDeltas and (pathBytes + deltaBytes > cls.DiffBatchMaxPathspecBytes
+                                  or numDeltas >= cls.DiffBatchMaxDeltas):
+                    batches.append((stem + paths, numDeltas))
+                    paths = []
+                    pathBytes = 0
+                    numDeltas = 0
+
+                paths += deltaPaths
+                pathBytes += deltaBytes
+                numDeltas += 1
+
+            if numDeltas:
+                batches.append((stem + paths, numDeltas))
+
+        for delta in untracked:
+            batches.append((cls.buildDiffCommand(delta, binary), 1))
+
+        return batches
+
     @classmethod
     def buildDiffCommandLFS(cls, delta: GitDelta) -> list[str]:
         # Check that both LFS object paths are available
@@ -254,6 +254,41 @@ def parseGitBlame(stdout: str) -> Iterator[tuple[str, int, str]]:
             pass
 
 
+class IncrementalBlameParser:
+    """
+    Resumable parser for the output of 'git blame --incremental'.
+
+    Feed it chunks of raw output as they come in (chunks don't need to be
+    aligned on line boundaries). Each complete blame entry is returned as a
+    tuple: (commit hash, original line number, final line number, line count).
+    """
+
+    def __init__(self):
+        self._partialLine = b""
+        self._header: tuple[str, int, int, int] | None = None
+
+    def feed(self, data: bytes) -> list[tuple[str, int, int, int]]:
+        lines = (self._partialLine + data).split(b"\n")
+        self._partialLine = lines.pop()
+
+        entries = []
+
+        for line in lines:
+            if self._header is None:
+                # "<hash> <original line> <final line> <line count>"
+                hexHash, originalLineNumber, finalLineNumber, count = line.split(b" ")
+                self._header = (hexHash.decode("ascii"), int(originalLineNumber), int(finalLineNumber), int(count))
+            elif line.startswith(b"filename "):
+                # "filename" always terminates an entry
+                entries.append(self._header)
+                self._header = None
+            else:
+                # Ignore author, summary, etc.
+                pass
+
+        return entries
+
+
 def parseAheadBehind(stdout: str) -> Iterator[tuple[str, tuple[int, int]]]:
     for pos, endPos in iterateLines(stdout):
         match = _aheadBehindPattern.match(stdout, pos, endPos)
@@ -94,6 +94,14 @@ class MockOid:
 
 
 class GraphBuildLoop:
+    """
+    Builds a graph from a commit sequence.
+
+    To append commits to the bottom of an existing graph instead of starting
+    from scratch, pass the graph as `resumeGraph` along with the commit
+    sequence it was built from (`resumeSequence`).
+    """
+
     onKeyframe: Callable[[int], None]
 
     def __init__(
@@ -102,18 +110,34 @@ class GraphBuildLoop:
             hideSeeds=None,
             localSeeds=None,
             forceHide=None,
-            keyframeInterval=KF_INTERVAL
+            keyframeInterval=KF_INTERVAL,
+            resumeGraph: Graph | None = None,
+            resumeSequence: Sequence[CommitTraits] = (),
     ):
         heads = _ensureSet(heads)
         hideSeeds = _ensureSet(hideSeeds)
         # If localSeeds was omitted, all heads are local by default
         localSeeds = _ensureSet(heads if localSeeds is None else localSeeds)
 
-        self.graph, self.weaver = GraphWeaver.newGraph()
+        if resumeGraph is None:
+            assert not resumeSequence
+            self.graph, self.weaver = GraphWeaver.newGraph()
+        else:
+            assert resumeSequence, "need the commit sequence to resume the graph"
+            self.graph = resumeGraph
+            self.weaver = GraphWeaver.resumeGraph(resumeGraph, len(resumeSequence) - 1)
+
         self.hiddenTrickle = GraphTrickle.newHiddenTrickle(heads, hideSeeds, forceHide)
         self.foreignTrickle = GraphTrickle.newForeignTrickle(heads, localSeeds)
         self.keyframeInterval = keyframeInterval
 
+        # The trickles' frontiers can't be recovered from an existing graph,
+        # so replay the commits that are already in the graph through them.
+        # This is much cheaper than weaving the graph again.
+        for commit in resumeSequence:
+            self.hiddenTrickle.newCommit(commit.id, commit.parent_ids)
+            self.foreignTrickle.newCommit(commit.id, commit.parent_ids)
+
         self.onKeyframe = GraphBuildLoop.defaultOnKeyframe
 
     def sendAll(self, sequence):
@@ -27,13 +27,46 @@ class GraphWeaver(Frame):
         graph.ownBatches.append(weaver.batchNo)
         return graph, weaver
 
-    def __init__(self, startArcSentinel: Arc):
+    @staticmethod
+    def resumeGraph(graph: Graph, lastRow: int) -> GraphWeaver:
+        """
+        Create a weaver that appends commits to the bottom of an existing graph
+        (e.g. to load more commits into a truncated history).
+
+        The weaver's state is reconstructed from the frame at the last row:
+        the arcs that are still open at that point are waiting for their
+        parent commits to appear further down.
+        """
+        frame = graph.getFrame(lastRow)
+        assert frame.lastArc.nextArc is None, "can only resume weaving from the bottom of the graph"
+
+        weaver = GraphWeaver(frame.lastArc, batchNo=frame.row.b)
+        weaver.row = frame.row
+        weaver.commit = frame.commit
+        weaver.openArcs = frame.openArcs.copy()
+        weaver.solvedArcs = [None] * len(weaver.openArcs)
+
+        for lane, arc in enumerate(weaver.openArcs):
+            if arc is None:
+                weaver.freeLanes.append(lane)
+            else:
+                assert arc.closedAt == BATCHROW_UNDEF
+                # The graph may have been spliced since it was woven. The weaver
+                # will extend the chains of open arcs, so it needs their master
+                # ChainHandles (aliased handles are read-only).
+                arc.chain = arc.chain.resolve()
+                weaver.parentLookup[arc.closedBy].append(arc)
+
+        weaver.peakArcCount = len(weaver.openArcs)
+        return weaver
+
+    def __init__(self, startArcSentinel: Arc, batchNo: int = -1):
         super().__init__(row=BATCHROW_UNDEF, commit=None,
                          solvedArcs=[], openArcs=[], lastArc=startArcSentinel)
         self.freeLanes = []
         self.parentLookup = collections.defaultdict(list)
         self.peakArcCount = 0
-        self.batchNo = BatchRow.BatchManager.reserveNewBatch()
+        self.batchNo = batchNo if batchNo >= 0 else BatchRow.BatchManager.reserveNewBatch()
 
     def newCommit(self, me: Oid, myParents: Sequence[Oid]):
         """Create arcs for a new commit row."""
@@ -72,18 +72,21 @@ class CommitLogModel(QAbstractListModel):
         self._authorColumnX = -1
         self._toolTipZones = {}
         self.commitDiffAB: tuple[Oid, Oid] | None = None
+        self._extraRow = self._pickExtraRow()
 
-        if repoModel.truncatedHistory:
-            self._extraRow = SpecialRow.TruncatedHistory
-        elif repoModel.repo.is_shallow:
-            self._extraRow = SpecialRow.EndOfShallowHistory
+    def _pickExtraRow(self) -> SpecialRow:
+        if self.repoModel.truncatedHistory:
+            return SpecialRow.TruncatedHistory
+        elif self.repoModel.repo.is_shallow:
+            return SpecialRow.EndOfShallowHistory
         else:
-            self._extraRow = SpecialRow.Invalid
+            return SpecialRow.Invalid
 
     def resetCommitSequence(self, nRemovedRows: int = -1, nAddedRows: int = 0):
         if nRemovedRows < 0:
             # Replace log wholesale
             self.beginResetModel()
+            self._extraRow = self._pickExtraRow()
             self.endResetModel()
             return
 
@@ -99,6 +102,32 @@ class CommitLogModel(QAbstractListModel):
             self.beginInsertRows(parent, 0, nAddedRows)
             self.endInsertRows()
 
+    def appendCommitSequence(self, nOldRows: int):
+        """
+        Insert rows for commits that were appended to the bottom of a
+        truncated history. The rows above are left untouched, so the
+        selection and scroll position are preserved.
+        """
+        parent = QModelIndex_default  # it's not a tree model so there's no parent
+        nRows = len(self.repoModel.commitSequence)
+
+        # The new commits go in between the old commits and the extra row
+        if nRows > nOldRows:
+            self.beginInsertRows(parent, nOldRows, nRows - 1)
+            self.endInsertRows()
+
+        extraRow = self._pickExtraRow()
+        if extraRow == self._extraRow:
+            pass
+        elif extraRow == SpecialRow.Invalid:
+            self.beginRemoveRows(parent, nRows, nRows)
+            self._extraRow = extraRow
+            self.endRemoveRows()
+        else:
+            self._extraRow = extraRow
+            index = self.index(nRows, 0)
+            self.dataChanged.emit(index, index)
+
     def rowCount(self, *args, **kwargs) -> int:
         n = len(self.repoModel.commitSequence)
         if self._extraRow != SpecialRow.Invalid:
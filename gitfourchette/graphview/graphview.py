@@ -338,6 +338,31 @@ class GraphView(QListView):
 
         return newFilterIndex
 
+    def getNeighborCommits(self, oid: Oid, radius: int = 1) -> list[Oid]:
+        """
+        Return the commits shown in the rows immediately below and above the
+        given commit (nearest first), skipping special rows.
+        """
+
+        try:
+            index = self.getFilterIndexForCommit(oid)
+        except GraphView.SelectCommitError:
+            return []
+
+        row = index.row()
+        neighbors = []
+        for distance in range(1, radius + 1):
+            for neighborRow in (row + distance, row - distance):
+                if not (0 <= neighborRow < self.clFilter.rowCount()):
+                    continue
+                neighborIndex = self.clFilter.index(neighborRow, 0)
+                neighborOid = neighborIndex.data(CommitLogModel.Role.Oid)
+                if neighborOid is None or neighborOid == UC_FAKEID:
+                    continue
+                neighbors.append(neighborOid)
+
+        return neighbors
+
     def isLocatorVisible(self, locator: NavLocator) -> bool:
         try:
             self.getFilterIndexForLocator(locator)
@@ -0,0 +1,148 @@
+# -----------------------------------------------------------------------------
+# Copyright (C) 2026 Iliyas Jorio.
+# This file is part of GitFourchette, distributed under the GNU GPL v3.
+# For full terms, see the included LICENSE file.
+# -----------------------------------------------------------------------------
+
+"""
+Index of commits that aren't reachable from any refs anymore.
+"""
+
+import dataclasses
+import logging
+
+from gitfourchette.porcelain import Oid, Repo
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class LostCommit:
+    id: Oid
+    summary: str
+    time: int
+    "Commit time (seconds since epoch)."
+
+    parents: tuple[str, ...]
+    "Hex hashes of the parent commits."
+
+    reflogMessage: str = ""
+    "If the commit was found in a reflog, the message of the latest reflog entry pointing to it."
+
+
+class LostCommitIndex:
+    """
+    Lists unreachable commits that are worth recalling: commits that are only
+    referenced by reflogs, and dangling commits (unreachable commits that
+    aren't the parent of another unreachable commit).
+
+    Commit metadata is cached across scans, so that rescanning only needs to
+    look up commits that are new to the object store.
+    """
+
+    ExcludedReflogs = ("refs/stash",)
+    "Reflogs whose entries aren't considered lost (stashes are shown elsewhere)."
+
+    knownCommits: set[str]
+    "Hex hashes of all the commits seen in the object store during the last scan."
+
+    details: dict[str, LostCommit]
+    "Metadata cache for unreachable commits."
+
+    lostCommits: list[LostCommit]
+    "Result of the last scan, most recent first."
+
+    isReady: bool
+    "True once the index has been built at least once."
+
+    def __init__(self):
+        self.knownCommits = set()
+        self.details = {}
+        self.lostCommits = []
+        self.isReady = False
+
+    @staticmethod
+    def parseBatchCheck(scrollback: str) -> set[str]:
+        """
+        Extract commit hashes from the output of
+        `git cat-file --batch-all-objects --batch-check="%(objecttype) %(objectname)"`.
+        """
+        commitPrefix = "commit "
+        prefixLength = len(commitPrefix)
+        return {line[prefixLength:] for line in scrollback.splitlines() if line.startswith(commitPrefix)}
+
+    @classmethod
+    def walkReflogs(cls, repo: Repo) -> dict[str, str]:
+        """
+        Map commit hashes found in reflogs to the message of the most recent
+        reflog entry pointing to them.
+        """
+        reflogTips = {}
+        for refName in dict.fromkeys(["HEAD", *repo.references]):
+            if refName in cls.ExcludedReflogs:
+                continue
+            try:
+                entries = repo.references[refName].log()
+            except (KeyError, ValueError):
+                continue
+            for entry in entries:  # newest first
+                reflogTips.setdefault(str(entry.oid_new), entry.message or "")
+        return reflogTips
+
+    def update(
+            self,
+            repo: Repo,
+            allCommits: set[str],
+            reachableCommits: set[str],
+            reflogTips: dict[str, str],
+    ) -> list[LostCommit]:
+        unreachable = allCommits - reachableCommits
+
+        newCommits = len(allCommits - self.knownCommits)
+        logger.debug(f"{len(allCommits)} commits in object store ({newCommits} new), {len(unreachable)} unreachable")
+
+        # Look up metadata for unreachable commits we haven't seen before
+        for hexId in unreachable:
+            if hexId not in self.details:
+                self.details[hexId] = self._lookUp(repo, hexId, reflogTips.get(hexId, ""))
+
+        # Forget about commits that are gone (gc) or reachable again
+        for hexId in [h for h in self.details if h not in unreachable]:
+            del self.details[hexId]
+
+        # Dangling commits aren't the parent of any other unreachable commit
+        hiddenByChild = set()
+        for lost in self.details.values():
+            hiddenByChild.update(lost.parents)
+
+        lostCommits = []
+        for hexId, lost in self.details.items():
+            reflogMessage = reflogTips.get(hexId, "")
+            if reflogMessage != lost.reflogMessage:
+                lost = dataclasses.replace(lost, reflogMessage=reflogMessage)
+                self.details[hexId] = lost
+            if hexId in reflogTips or hexId not in hiddenByChild:
+                lostCommits.append(lost)
+
+        lostCommits.sort(key=lambda lc: lc.time, reverse=True)
+
+        self.knownCommits = allCommits
+        self.lostCommits = lostCommits
+        self.isReady = True
+        return lostCommits
+
+    @staticmethod
+    def _lookUp(repo: Repo, hexId: str, reflogMessage: str) -> LostCommit:
+        commit = repo.peel_commit(Oid(hex=hexId))
+        summary = commit.message.split("\n", 1)[0]
+        parents = tuple(str(p) for p in commit.parent_ids)
+        return LostCommit(commit.id, summary, commit.commit_time, parents, reflogMessage)
+
+    def filter(self, needle: str) -> list[LostCommit]:
+        needle = needle.strip().lower()
+        if not needle:
+            return self.lostCommits
+        return [lc for lc in self.lostCommits
+                if str(lc.id).startswith(needle)
+                or needle in lc.summary.lower()
+                or needle in lc.reflogMessage.lower()]
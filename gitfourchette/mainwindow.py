@@ -27,6 +27,7 @@ from gitfourchette.forms.maintoolbar import MainToolBar
 from gitfourchette.forms.repostub import RepoStub
 from gitfourchette.forms.searchbar import SearchBar
 from gitfourchette.forms.textinputdialog import TextInputDialog
+from gitfourchette.forms.trashbrowser import TrashBrowser
 from gitfourchette.forms.welcomewidget import WelcomeWidget
 from gitfourchette.globalshortcuts import GlobalShortcuts
 from gitfourchette.localization import *
@@ -769,13 +770,16 @@ class MainWindow(QMainWindow):
 
     def openRescueFolder(self) -> None:
         trash = Trash.instance()
-        if trash.exists():
-            openFolder(str(trash.trashDir))
+        if trash.count() > 0:
+            dlg = TrashBrowser(self, trash)
+            dlg.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+            dlg.setWindowModality(Qt.WindowModality.WindowModal)
+            dlg.show()
         else:
             showInformation(
                 self,
-                _("Open trash folder"),
-                _("There’s no trash folder. Perhaps you haven’t discarded a change with {0} yet.", qAppName()))
+                _("Open trash"),
+                _("The trash is empty. Perhaps you haven’t discarded a change with {0} yet.", qAppName()))
 
     def clearRescueFolder(self) -> None:
         trash = Trash.instance()
@@ -1160,6 +1164,7 @@ class MainWindow(QMainWindow):
             for rw in self.tabs.widgets():
                 if not isinstance(rw, RepoWidget):
                     continue
+                rw.repoModel.patchCache.clear()
                 locator = rw.taskRunner.pendingEpilog.jumpTo or rw.navLocator
                 locator = locator.withExtraFlags(NavFlags.ForceDiff | NavFlags.ForceRecreateDocument)
                 rw.taskRunner.pendingEpilog.jumpTo = locator
@@ -11,9 +11,11 @@ from collections.abc import Iterable, Iterator
 
 from gitfourchette import settings
 from gitfourchette.appconsts import *
+from gitfourchette.diffview.patchcache import PatchCache
 from gitfourchette.gitdriver import GitDelta
-from gitfourchette.graph import Graph, GraphSpliceLoop, MockCommit
+from gitfourchette.graph import Graph, GraphBuildLoop, GraphSpliceLoop, MockCommit
 from gitfourchette.graph.graphbuilder import CommitTraits
+from gitfourchette.lostcommits import LostCommitIndex
 from gitfourchette.porcelain import *
 from gitfourchette.qt import *
 from gitfourchette.repoprefs import RepoPrefs
@@ -100,6 +102,79 @@ class CommitPathspecFilter(QObject):
         return bool(self.needle) and self.matchingIds is None
 
 
+class CommitDiffCache:
+    """
+    Bounded LRU cache of the deltas between two commits, as parsed from the
+    output of `git diff --raw`. Keys are (parent, commit) pairs.
+
+    The cache is flushed whenever any option that affects diffing changes.
+    """
+
+    MaxBudget = 50_000
+    """
+    Maximum total number of deltas across all cached commit diffs.
+    """
+
+    cache: dict[tuple[Oid | None, Oid], list[GitDelta]]
+    totalDeltas: int
+    optionsKey: tuple
+
+    def __init__(self):
+        self.cache = {}
+        self.totalDeltas = 0
+        self.optionsKey = ()
+
+    @staticmethod
+    def diffOptionsKey(repo: Repo) -> tuple:
+        return (
+            settings.prefs.whitespaceMode,
+            repo.get_config_value("diff.renames"),
+            repo.get_config_value("diff.renameLimit"),
+        )
+
+    def syncOptions(self, repo: Repo):
+        optionsKey = self.diffOptionsKey(repo)
+        if optionsKey != self.optionsKey:
+            if self.cache:
+                logger.debug("Diff options changed, flushing commit diff cache")
+            self.clear()
+            self.optionsKey = optionsKey
+
+    def get(self, diffAB: tuple[Oid | None, Oid]) -> list[GitDelta]:
+        deltas = self.cache.pop(diffAB)
+        self.cache[diffAB] = deltas  # Bump key
+        return deltas
+
+    def put(self, diffAB: tuple[Oid | None, Oid], deltas: list[GitDelta]):
+        cost = max(1, len(deltas))
+
+        if diffAB in self.cache:
+            self.evict(diffAB)
+
+        # If the diff is larger than the cache capacity, just bail
+        if cost > self.MaxBudget:
+            return
+
+        # Make room, least recently used first
+        keys = list(self.cache)
+        while self.totalDeltas + cost > self.MaxBudget:
+            self.evict(keys.pop(0))
+
+        self.cache[diffAB] = deltas
+        self.totalDeltas += cost
+
+    def evict(self, diffAB: tuple[Oid | None, Oid]):
+        deltas = self.cache.pop(diffAB)
+        self.totalDeltas -= max(1, len(deltas))
+
+    def clear(self):
+        self.cache.clear()
+        self.totalDeltas = 0
+
+    def __contains__(self, diffAB: tuple[Oid | None, Oid]) -> bool:
+        return diffAB in self.cache
+
+
 class RepoModel:
     repo: Repo
 
@@ -107,6 +182,13 @@ class RepoModel:
     """Walker used to generate the graph. Call initializeWalker before use.
     Keep it around to speed up ulterior refreshes."""
 
+    truncatedWalker: Walker | None
+    """Walker that stopped at the bottom of the truncated history.
+    Keep it around so that loading more commits can resume the walk."""
+
+    truncatedWalkerRefs: list[tuple[str, Oid]]
+    "Refs that truncatedWalker was primed with."
+
     commitSequence: list[CommitTraits]
     "Ordered list of commits."
 
@@ -161,6 +243,15 @@ class RepoModel:
     gpgStatusCache: dict[Oid, tuple[GpgStatus, str]]
     gpgVerifyQueue: set[Oid]
 
+    commitDiffCache: CommitDiffCache
+    "Parsed file lists of recently viewed (or prefetched) commits."
+
+    patchCache: PatchCache
+    "Recently loaded (or prefetched) patches for individual files."
+
+    lostCommitIndex: LostCommitIndex
+    "Commits that aren't reachable from any refs (for RecallCommit)."
+
     workdirStale: bool
     "Flag indicating that the workdir should be refreshed before use."
 
@@ -182,6 +273,8 @@ class RepoModel:
         self.truncatedHistory = True
 
         self.walker = None
+        self.truncatedWalker = None
+        self.truncatedWalkerRefs = []
         self.graph = Graph()
 
         self.headIsDetached = False
@@ -215,6 +308,10 @@ class RepoModel:
         self.gpgStatusCache = {}
         self.gpgVerifyQueue = set()
 
+        self.commitDiffCache = CommitDiffCache()
+        self.patchCache = PatchCache()
+        self.lostCommitIndex = LostCommitIndex()
+
         self.repo = repo
 
         self.prefs = RepoPrefs.initForRepo(repo)
@@ -400,6 +497,74 @@ class RepoModel:
 
         return self.walker
 
+    def setTruncatedWalker(self, walker: Walker | None):
+        if walker is not None and walker is self.walker:
+            # Don't let ulterior refreshes reset this walker
+            self.walker = None
+        self.truncatedWalker = walker
+        self.truncatedWalkerRefs = list(self.refs.items()) if walker is not None else []
+
+    @benchmark
+    def resumeWalker(self) -> Walker | None:
+        """
+        Return a walker that yields the commits that come after the bottom of
+        the truncated history.
+
+        Return None if the commit sequence doesn't match the beginning of
+        a fresh walk anymore. In that case, the graph must be rebuilt from
+        scratch.
+        """
+        walker = self.truncatedWalker
+        if walker is not None and self.truncatedWalkerRefs == list(self.refs.items()):
+            return walker
+
+        # The refs have moved since the walk stopped, so the top of the graph
+        # may have been spliced. Walk the history that we've already loaded
+        # (without weaving it) and make sure it still lines up with the
+        # commit sequence.
+        walker = self.primeWalker()
+        self.setTruncatedWalker(None)
+        self.walker = None
+
+        for loadedCommit in itertools.islice(self.commitSequence, 1, None):
+            commit = next(walker, None)
+            if commit is None or commit.id != loadedCommit.id:
+                return None
+
+        return walker
+
+    @benchmark
+    def buildGraph(self, commitSequence: list[CommitTraits], truncatedHistory: bool, onKeyframe=None):
+        hideSeeds = self.getHiddenTips()
+        localSeeds = self.getLocalTips()
+        buildLoop = GraphBuildLoop(heads=self.getKnownTips(), hideSeeds=hideSeeds, localSeeds=localSeeds)
+        if onKeyframe is not None:
+            buildLoop.onKeyframe = onKeyframe
+        buildLoop.sendAll(commitSequence)
+
+        self.hiddenCommits = buildLoop.hiddenCommits
+        self.foreignCommits = buildLoop.foreignCommits
+        self.commitSequence = commitSequence
+        self.truncatedHistory = truncatedHistory
+        self.graph = buildLoop.graph
+        self.hideSeeds = hideSeeds
+        self.localSeeds = localSeeds
+
+    @benchmark
+    def appendToGraph(self, commits: list[CommitTraits], truncatedHistory: bool):
+        """
+        Weave more commits into the bottom of a truncated graph.
+        """
+        assert self.truncatedHistory
+        buildLoop = GraphBuildLoop(heads=self.getKnownTips(), hideSeeds=self.hideSeeds, localSeeds=self.localSeeds,
+                                   resumeGraph=self.graph, resumeSequence=self.commitSequence)
+        buildLoop.sendAll(commits)
+
+        self.hiddenCommits = buildLoop.hiddenCommits
+        self.foreignCommits = buildLoop.foreignCommits
+        self.commitSequence.extend(commits)
+        self.truncatedHistory = truncatedHistory
+
     def uncommittedChangesMockCommit(self):
         try:
             head = self.refs["HEAD"]
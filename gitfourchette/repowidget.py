@@ -29,6 +29,8 @@ from gitfourchette.repomodel import RepoModel, UC_FAKEID
 from gitfourchette.sidebar.sidebar import Sidebar
 from gitfourchette.syntax import LexJobCache
 from gitfourchette.tasks import RepoTaskRunner, TaskEffects, TaskBook
+from gitfourchette.tasks.jumptasks import PrefetchCommitDiffs
+from gitfourchette.tasks.loadtasks import ExtendHistory, PrefetchPatches
 from gitfourchette.tasks.misctasks import VerifyGpgQueue
 from gitfourchette.tasks.nettasks import AutoFetchRemotes
 from gitfourchette.toolbox import *
@@ -412,6 +414,8 @@ class RepoWidget(QWidget):
             searchBar.buddy = None
         # Release any LexJobs that we own (it's not a big deal if we lose cached jobs for other tabs)
         LexJobCache.clear()
+        # Release prefetched documents
+        self.repoModel.patchCache.clear()
 
     def blameFile(self, path="", atCommit=NULL_OID):
         # Path not specified: pick one from the current locator
@@ -745,11 +749,9 @@ class RepoWidget(QWidget):
             locator = NavLocator.parseUrl(url)
             self.jump(locator)
         elif url.authority() == "expandlog":
-            # After loading, jump back to what is currently the last commit
-            jumpTo = NavLocator.inCommit(self.repoModel.commitSequence[-1].id)
-            # Reload the repo
+            # Load more commits into the existing graph
             maxCommits = int(kwargs.get("n", self.repoModel.nextTruncationThreshold))
-            self.replaceWithStub(jumpTo, maxCommits)
+            ExtendHistory.invoke(self, maxCommits)
         elif url.authority() == "prefs":
             self.openPrefs.emit(simplePath)
         else:  # pragma: no cover
@@ -808,3 +810,50 @@ class RepoWidget(QWidget):
             return
 
         VerifyGpgQueue.invoke(self)
+
+    @CallbackAccumulator.deferredMethod(250)
+    def schedulePrefetchCommitDiffs(self):
+        if self.taskRunner.repoModel is None:
+            # The RepoWidget was closed before the timer fired
+            return
+
+        if self.taskRunner.isBusy():
+            # Thanks to the deferredMethod decorator, this will reschedule
+            # the call (instead of recursing).
+            self.schedulePrefetchCommitDiffs()
+            return
+
+        # Only prefetch around a single commit (not an A/B comparison)
+        locator = self.navLocator
+        if locator.context != NavContext.COMMITTED or locator.commitDiffAB():
+            return
+
+        neighbors = self.graphView.getNeighborCommits(locator.commit)
+        if not neighbors:
+            return
+
+        PrefetchCommitDiffs.invoke(self, neighbors)
+
+    @CallbackAccumulator.deferredMethod(250)
+    def schedulePrefetchPatches(self):
+        if self.taskRunner.repoModel is None:
+            # The RepoWidget was closed before the timer fired
+            return
+
+        if self.taskRunner.isBusy():
+            # Thanks to the deferredMethod decorator, this will reschedule
+            # the call (instead of recursing).
+            self.schedulePrefetchPatches()
+            return
+
+        locator = self.navLocator
+        if not locator.path or locator.context == NavContext.SPECIAL:
+            return
+
+        fileList = self.diffArea.fileListByContext(locator.context)
+        deltas = [d for d in fileList.neighborDeltas(locator.path) if d.conflict is None]
+        if not deltas:
+            return
+
+        locators = [locator.replace(path=d.new.path) for d in deltas]
+        PrefetchPatches.invoke(self, deltas, locators)
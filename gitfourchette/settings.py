@@ -174,7 +174,7 @@ class Prefs(PrefsFile):
     middleClickStageLines       : bool                  = True
 
     _category_trash             : int                   = 0
-    maxTrashFiles               : int                   = 250
+    maxTrashMB                  : int                   = 100
     maxTrashFileKB              : int                   = 1000
 
     _category_advanced          : int                   = 0
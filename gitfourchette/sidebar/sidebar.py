@@ -938,8 +938,12 @@ class Sidebar(QTreeView):
     @benchmark
     def restoreExpandedItems(self):
         """
-        Assumes all collapsible rows are collapsed before this is called.
-        (After rebuilding the model, all rows are collapsed by default.)
+        Expand all nonleaf rows that aren't in the collapse cache.
+
+        Rows that are already expanded are left alone, so this is also suitable
+        for expanding rows that were just inserted by an incremental refresh.
+        Rows that must be collapsed are assumed to be collapsed already.
+        (After resetting the model, all rows are collapsed by default.)
         """
 
         model = self.sidebarModel
@@ -952,6 +956,8 @@ class Sidebar(QTreeView):
                 continue
 
             if node.wantForceExpand() or node.getCollapseHash() not in model.collapseCache:
+                # Our expanded signal may be blocked, so populate lazy nodes here
+                model.populateLazyNode(node)
                 index = self.nodeToFilterIndex(node)
                 self.expand(index)
 
@@ -973,6 +979,7 @@ class Sidebar(QTreeView):
     def onIndexExpanded(self, index: QModelIndex):
         node = self.filterIndexToNode(index)
         self.sidebarModel.cacheNodeCollapsedState(node, collapsed=False)
+        self.sidebarModel.populateLazyNode(node)
 
     def onIndexCollapsed(self, index: QModelIndex):
         node = self.filterIndexToNode(index)
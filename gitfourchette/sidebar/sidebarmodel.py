@@ -100,6 +100,25 @@ class SidebarLayout:
         SidebarItem.RefFolder,
     ])
 
+    StaticItems: ClassVar = sorted([
+        SidebarItem.Spacer,
+        SidebarItem.Tag,
+        SidebarItem.Submodule,
+    ])
+    """
+    Items whose appearance only depends on their node's data. Other items may
+    depend on the state of the RepoModel (checked-out branch, ahead/behind,
+    hidden refs, child count in collapsed headers...), so they must be
+    repainted whenever the model is refreshed.
+    """
+
+    LazyItems: ClassVar = [
+        SidebarItem.TagsHeader,
+    ]
+    """
+    Headers that aren't populated until they're expanded for the first time.
+    """
+
 
 class SidebarNode:
     children: list[SidebarNode]
@@ -110,6 +129,12 @@ class SidebarNode:
     warning: str
     displayName: str
 
+    lazyChildren: list[SidebarNode] | None
+    """
+    Children that haven't been exposed to the views yet (see SidebarModel.populateLazyNode).
+    None if the node is fully populated.
+    """
+
     @staticmethod
     def fromIndex(index: QModelIndex) -> SidebarNode:
         if not index.isValid():
@@ -126,6 +151,7 @@ class SidebarNode:
         self.data = data
         self.warning = ""
         self.displayName = ""
+        self.lazyChildren = None
 
     def appendChild(self, node: SidebarNode):
         assert self.mayHaveChildren()
@@ -170,6 +196,14 @@ class SidebarNode:
         """ Use this to compare SidebarNodes from two different models. """
         return self.kind == other.kind and self.data == other.data
 
+    def similarityKey(self) -> tuple[SidebarItem, str]:
+        """ Hashable counterpart to isSimilarEnoughTo. """
+        return self.kind, self.data
+
+    def childCount(self) -> int:
+        """ Number of children, including those that haven't been fetched yet. """
+        return len(self.children) + len(self.lazyChildren or ())
+
     def isLeafBranchKind(self):
         return self.kind == SidebarItem.LocalBranch or self.kind == SidebarItem.RemoteBranch
 
@@ -324,13 +358,50 @@ class SidebarModel(QAbstractItemModel):
 
     @benchmark
     def rebuild(self, repoModel: RepoModel):
-        self.beginResetModel()
+        """
+        Rebuild the node tree from the current state of the RepoModel.
+
+        When refreshing the same repo, the new tree is merged into the existing
+        one, so the views only receive fine-grained row insertions, removals,
+        moves and data changes instead of a full reset. Nodes that survive the
+        refresh are kept as-is, so selection, hover state and persistent
+        indexes remain valid.
+        """
+
+        if repoModel is not self.repoModel:
+            self.beginResetModel()
+            self.clear(emitSignals=False)
+            self.repoModel = repoModel
+            self.rootNode, self.nodesByRef = self.buildTree(None)
+            self.endResetModel()
+            return
+
+        self.clearCachedTooltip()
 
+        newRoot, newNodesByRef = self.buildTree(self.rootNode)
+
+        # Merge the new tree into the live tree, keeping track of the
+        # new nodes that were superseded by existing nodes.
+        survivors: dict[int, SidebarNode] = {}
+        self.mergeNode(self.rootNode, newRoot, survivors)
+
+        self.nodesByRef = {ref: survivors.get(id(node), node) for ref, node in newNodesByRef.items()}
+
+    def buildTree(self, oldRoot: SidebarNode | None) -> tuple[SidebarNode, dict[str, SidebarNode]]:
+        """
+        Create a fresh node tree from the state of the RepoModel.
+        Returns the root node and the new nodesByRef mapping.
+
+        If oldRoot is given, lazy headers that have been populated in the
+        old tree are populated in the new tree as well.
+        """
+
+        repoModel = self.repoModel
         repo = repoModel.repo
+        nodesByRef: dict[str, SidebarNode] = {}
 
-        self.clear(emitSignals=False)
-        self.repoModel = repoModel
-        self.nodesByRef = {}
+        self._checkedOut = ""
+        self._checkedOutUpstream = ""
 
         # Pending ref shorthands for _makeRefTreeNodes
         localBranches = []
@@ -343,6 +414,7 @@ class SidebarModel(QAbstractItemModel):
         rootNode = SidebarNode(SidebarItem.Root)
         for eitem in SidebarLayout.RootItems:
             rootNode.appendChild(SidebarNode(eitem))
+        workdirNode = rootNode.findChild(SidebarItem.WorkdirHeader)
         uncommittedNode = rootNode.findChild(SidebarItem.UncommittedChanges)
         branchRoot = rootNode.findChild(SidebarItem.LocalBranchesHeader)
         remoteRoot = rootNode.findChild(SidebarItem.RemotesHeader)
@@ -350,10 +422,9 @@ class SidebarModel(QAbstractItemModel):
         submoduleRoot = rootNode.findChild(SidebarItem.SubmodulesHeader)
         stashRoot = rootNode.findChild(SidebarItem.StashesHeader)
 
-        self.rootNode = rootNode
-        self.nodesByRef[UC_FAKEREF] = uncommittedNode
+        nodesByRef[UC_FAKEREF] = uncommittedNode
 
-        self.refreshRepoName()
+        workdirNode.displayName = settings.history.getRepoNickname(repo.workdir)
 
         # -----------------------------
         # HEAD
@@ -370,7 +441,7 @@ class SidebarModel(QAbstractItemModel):
             target = target.removeprefix(RefPrefix.HEADS)
             node = SidebarNode(SidebarItem.UnbornHead, target)
             branchRoot.appendChild(node)
-            self.nodesByRef["HEAD"] = node
+            nodesByRef["HEAD"] = node
 
         else:
             # It's not unborn
@@ -379,7 +450,7 @@ class SidebarModel(QAbstractItemModel):
                 assert repo.head_is_detached
                 node = SidebarNode(SidebarItem.DetachedHead, str(repo.head.target))
                 branchRoot.appendChild(node)
-                self.nodesByRef["HEAD"] = node
+                nodesByRef["HEAD"] = node
 
             else:
                 # We're on a branch
@@ -432,17 +503,23 @@ class SidebarModel(QAbstractItemModel):
                 warnings.warn(f"SidebarModel: unsupported ref prefix: {name}")
 
         # Populate local branch tree
-        self.populateRefNodeTree(localBranches, branchRoot, SidebarItem.LocalBranch, RefPrefix.HEADS, repoModel.prefs.sortBranches)
-
-        # Populate tag tree
-        self.populateRefNodeTree(tags, tagRoot, SidebarItem.Tag, RefPrefix.TAGS, repoModel.prefs.sortTags)
+        self.populateRefNodeTree(localBranches, branchRoot, SidebarItem.LocalBranch, RefPrefix.HEADS, repoModel.prefs.sortBranches, nodesByRef)
+
+        # Populate tag tree. If the header is collapsed, don't expose the tags
+        # to the views until the header is expanded (see populateLazyNode).
+        if self.wantLazyNode(tagRoot, oldRoot):
+            self.populateRefNodeTree(tags, tagRoot, SidebarItem.Tag, RefPrefix.TAGS, repoModel.prefs.sortTags, {})
+            tagRoot.lazyChildren = tagRoot.children
+            tagRoot.children = []
+        else:
+            self.populateRefNodeTree(tags, tagRoot, SidebarItem.Tag, RefPrefix.TAGS, repoModel.prefs.sortTags, nodesByRef)
 
         # Populate remote tree
         for remote, branches in remoteBranchesDict.items():
             remoteNode = remoteRoot.findChild(SidebarItem.Remote, remote)
             assert remoteNode is not None
             remotePrefix = f"{RefPrefix.REMOTES}{remote}/"
-            self.populateRefNodeTree(branches, remoteNode, SidebarItem.RemoteBranch, remotePrefix, repoModel.prefs.sortRemoteBranches)
+            self.populateRefNodeTree(branches, remoteNode, SidebarItem.RemoteBranch, remotePrefix, repoModel.prefs.sortRemoteBranches, nodesByRef)
 
         # -----------------------------
         # Stashes
@@ -454,7 +531,7 @@ class SidebarModel(QAbstractItemModel):
             node = SidebarNode(SidebarItem.Stash, str(stashCommitId))
             node.displayName = message
             stashRoot.appendChild(node)
-            self.nodesByRef[refName] = node
+            nodesByRef[refName] = node
 
         # -----------------------------
         # Submodules
@@ -466,10 +543,7 @@ class SidebarModel(QAbstractItemModel):
             if submoduleKey not in repoModel.initializedSubmodules:
                 node.warning = _("Submodule not initialized.")
 
-        # -----------------------------
-        # Commit new model
-        # -----------------------------
-        self.endResetModel()
+        return rootNode, nodesByRef
 
     def populateRefNodeTree(
             self,
@@ -477,7 +551,8 @@ class SidebarModel(QAbstractItemModel):
             containerNode: SidebarNode,
             kind: SidebarItem,
             refNamePrefix: str,
-            sortMode: RefSort = RefSort.UseGlobalPref
+            sortMode: RefSort,
+            nodesByRef: dict[str, SidebarNode],
     ):
         pendingFolders: dict[str, SidebarNode] = {}
 
@@ -511,7 +586,7 @@ class SidebarModel(QAbstractItemModel):
             refName = refNamePrefix + sh
             node = SidebarNode(kind, refName)
             folderNode.appendChild(node)
-            self.nodesByRef[refName] = node
+            nodesByRef[refName] = node
 
         for folderName, folderNode in pendingFolders.items():
             parts = folderName.split("/")
@@ -530,6 +605,156 @@ class SidebarModel(QAbstractItemModel):
                 folderNode.displayName = folderNode.data.removeprefix(refNamePrefix)
                 containerNode.appendChild(folderNode)
 
+    def wantLazyNode(self, node: SidebarNode, oldRoot: SidebarNode | None) -> bool:
+        if node.kind not in SidebarLayout.LazyItems:
+            return False
+
+        if node.getCollapseHash() not in self.collapseCache:
+            return False
+
+        # Once a lazy node has been populated, keep it that way
+        if oldRoot is not None:
+            oldNode = oldRoot.findChild(node.kind, node.data)
+            return oldNode.lazyChildren is not None
+
+        return True
+
+    def mergeNode(self, oldNode: SidebarNode, newNode: SidebarNode, survivors: dict[int, SidebarNode]) -> bool:
+        """
+        Bring oldNode (in the live tree) up to date with newNode (in a tree
+        freshly created by buildTree), emitting fine-grained signals along
+        the way.
+
+        Returns True if oldNode needs to be repainted.
+        """
+
+        assert oldNode.isSimilarEnoughTo(newNode)
+        survivors[id(newNode)] = oldNode
+
+        dirty = (oldNode.kind not in SidebarLayout.StaticItems
+                 or oldNode.displayName != newNode.displayName
+                 or oldNode.warning != newNode.warning)
+
+        oldNode.displayName = newNode.displayName
+        oldNode.warning = newNode.warning
+
+        if oldNode.children or newNode.children:
+            self.mergeChildren(oldNode, newNode, survivors)
+
+        oldNode.lazyChildren = newNode.lazyChildren
+        for child in oldNode.lazyChildren or ():
+            child.parent = oldNode
+
+        return dirty
+
+    def mergeChildren(self, oldParent: SidebarNode, newParent: SidebarNode, survivors: dict[int, SidebarNode]):
+        parentIndex = self.createIndexFromNode(oldParent) if oldParent is not self.rootNode else QModelIndex()
+        liveChildren = oldParent.children
+        newChildren = newParent.children
+
+        # Match old children to new children. Nodes aren't necessarily unique
+        # (e.g. spacers), so match duplicates in order of appearance.
+        wantedCounts: dict[tuple, int] = {}
+        for node in newChildren:
+            key = node.similarityKey()
+            wantedCounts[key] = wantedCounts.get(key, 0) + 1
+
+        keep = []
+        for node in liveChildren:
+            key = node.similarityKey()
+            wanted = wantedCounts.get(key, 0)
+            keep.append(wanted > 0)
+            wantedCounts[key] = wanted - 1
+
+        # Remove stale children, one contiguous run at a time (bottom-up)
+        row = len(liveChildren) - 1
+        while row >= 0:
+            if keep[row]:
+                row -= 1
+                continue
+            last = row
+            while row >= 0 and not keep[row]:
+                row -= 1
+            first = row + 1
+            self.beginRemoveRows(parentIndex, first, last)
+            del liveChildren[first: last + 1]
+            self._renumberChildren(oldParent, first)
+            self.endRemoveRows()
+
+        # Remaining live children, by similarity key, in order of appearance
+        pending: dict[tuple, list[SidebarNode]] = {}
+        for node in liveChildren:
+            pending.setdefault(node.similarityKey(), []).append(node)
+
+        # Walk the new children; move matching live nodes into place
+        # and insert new nodes in contiguous runs.
+        dirtyRows = []
+        row = 0
+        while row < len(newChildren):
+            candidates = pending.get(newChildren[row].similarityKey())
+
+            if not candidates:
+                end = row + 1
+                while end < len(newChildren) and not pending.get(newChildren[end].similarityKey()):
+                    end += 1
+                self.beginInsertRows(parentIndex, row, end - 1)
+                for node in newChildren[row: end]:
+                    node.parent = oldParent
+                liveChildren[row:row] = newChildren[row: end]
+                self._renumberChildren(oldParent, row)
+                self.endInsertRows()
+                row = end
+                continue
+
+            node = candidates.pop(0)
+            if node.row != row:
+                assert node.row > row
+                oldRow = node.row
+                self.beginMoveRows(parentIndex, oldRow, oldRow, parentIndex, row)
+                del liveChildren[oldRow]
+                liveChildren.insert(row, node)
+                self._renumberChildren(oldParent, row, oldRow + 1)
+                self.endMoveRows()
+
+            if self.mergeNode(node, newChildren[row], survivors):
+                dirtyRows.append(row)
+            row += 1
+
+        assert len(liveChildren) == len(newChildren)
+
+        if dirtyRows:
+            topLeft = self.createIndexFromNode(liveChildren[dirtyRows[0]])
+            bottomRight = self.createIndexFromNode(liveChildren[dirtyRows[-1]])
+            self.dataChanged.emit(topLeft, bottomRight)
+
+    @staticmethod
+    def _renumberChildren(parent: SidebarNode, start: int, stop: int = -1):
+        children = parent.children
+        if stop < 0:
+            stop = len(children)
+        for row in range(start, stop):
+            children[row].row = row
+
+    def populateLazyNode(self, node: SidebarNode):
+        """
+        Expose the children of a lazy node to the views.
+        Call this before the node is expanded.
+        """
+
+        lazyChildren = node.lazyChildren
+        node.lazyChildren = None
+
+        if not lazyChildren:
+            return
+
+        assert not node.children
+        self.beginInsertRows(self.createIndexFromNode(node), 0, len(lazyChildren) - 1)
+        node.children = lazyChildren
+        for child in node.walk():
+            if not child.mayHaveChildren():
+                self.nodesByRef[child.data] = child
+        self.endInsertRows()
+
     def createIndexFromNode(self, node: SidebarNode) -> QModelIndex:
         index = self.createIndex(node.row, 0, node)
         return index
@@ -826,7 +1051,7 @@ class SidebarModel(QAbstractItemModel):
                 else:
                     name = trtables.enum(item)
                     if node.getCollapseHash() in self.collapseCache:
-                        name += f" ({len(node.children)})"
+                        name += f" ({node.childCount()})"
                     return name
             elif refRole:
                 return ""
@@ -55,11 +55,14 @@ from gitfourchette.tasks.jumptasks import (
     JumpForward,
     JumpToHEAD,
     JumpToUncommittedChanges,
+    PrefetchCommitDiffs,
     RefreshRepo,
 )
 from gitfourchette.tasks.loadtasks import (
     DownloadLfsObjects,
+    ExtendHistory,
     LoadPatchInNewWindow,
+    PrefetchPatches,
 )
 from gitfourchette.tasks.nettasks import (
     AutoFetchRemotes,
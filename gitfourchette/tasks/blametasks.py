@@ -10,7 +10,7 @@ from gitfourchette import settings
 from gitfourchette.blameview.blamemodel import BlameModel, RevList, Revision
 from gitfourchette.diffview.diffdocument import LineData
 from gitfourchette.gitdriver import argsIf, GitDriver, GitStatus, GitDeltaSource, GitDelta
-from gitfourchette.gitdriver.parsers import parseGitBlame
+from gitfourchette.gitdriver.parsers import IncrementalBlameParser, parseGitBlame
 from gitfourchette.localization import *
 from gitfourchette.porcelain import *
 from gitfourchette.qt import *
@@ -273,6 +273,9 @@ class OpenBlameToLine(RepoTask):
 
 
 class BlameRevision(RepoTask):
+    RefreshInterval = 100
+    "Milliseconds between gutter refreshes while 'git blame' is streaming results."
+
     def broadcastProcesses(self) -> bool:
         # Don't show ProcessDialog when switching to another revision
         return False
@@ -315,27 +318,43 @@ class BlameRevision(RepoTask):
         blameWindow.syncNavButtons()
 
         # Load the annotated revision if we haven't cached it before.
-        # Note that the user can kill the task here, either by closing the
-        # BlameWindow, or by switching to another commit using the scrubber
-        # or nav buttons.
+        # The file is displayed right away, and its gutter is filled in as
+        # 'git blame' progresses. Note that the user can kill the task here,
+        # either by closing the BlameWindow, or by switching to another commit
+        # using the scrubber or nav buttons (this terminates 'git blame').
         if not revision.isAnnotated():
             blameWindow.busySpinner.start()
-            yield from self._annotate(revision, blameModel)
+            self._beginAnnotation(revision, blameModel)
+            oldTopBlock = self._display(revision, previousRevision, saveAndTransposePosition, blameWindow)
+            scrollBar = blameWindow.textEdit.verticalScrollBar()
+            scrollValue = scrollBar.value()
+
+            yield from self._annotate(revision, blameModel, blameWindow)
             assert revision.isAnnotated()
+            blameWindow.textEdit.gutter.update()
+
+            # Now that we know where the lines come from, transpose the scroll
+            # position across revisions (unless the user has scrolled already)
+            if saveAndTransposePosition and scrollBar.value() == scrollValue:
+                self._transposeScrollPosition(revision, previousRevision, oldTopBlock, blameWindow)
+        else:
+            self._display(revision, previousRevision, saveAndTransposePosition, blameWindow)
 
-        # OK, we haven't been interrupted and we're ready to display the file.
-        # Make this TraceNode current in the model.
+        blameWindow.busySpinner.stop()
+        blameWindow.syncNavButtons()
+
+    def _display(self, revision: Revision, previousRevision: Revision, saveAndTransposePosition: bool, blameWindow: BlameWindow) -> int:
+        """
+        Show the revision's text in the BlameWindow.
+        Returns the top line number (QTextBlock) before switching revisions.
+        """
+
+        blameModel = blameWindow.model
+
+        # Make this revision current in the model.
         blameModel.currentRevision = revision
 
-        # Figure out which line number (QTextBlock) to scroll to
-        topBlock = blameWindow.textEdit.topLeftCornerCursor().blockNumber()
-        if saveAndTransposePosition:  # Attempt to restore position across files
-            try:
-                oldLine = previousRevision.blameLines[1 + topBlock]
-                topBlock = revision.findLine(oldLine, topBlock) - 1
-            except (IndexError,  # Zero lines in annotatedFile ("File deleted in commit" notice)
-                    ValueError):  # Could not findLineByReference
-                pass  # default to raw line number already stored in topBlock
+        oldTopBlock = blameWindow.textEdit.topLeftCornerCursor().blockNumber()
 
         # Get file text
         useLexer = False
@@ -369,8 +388,7 @@ class BlameRevision(RepoTask):
         blameWindow.setWindowTitle(title)
 
         if saveAndTransposePosition:
-            blockPosition = blameWindow.textEdit.document().findBlockByNumber(topBlock).position()
-            blameWindow.textEdit.restoreScrollPosition(blockPosition)
+            self._transposeScrollPosition(revision, previousRevision, oldTopBlock, blameWindow)
 
         # Install lex job
         lexJob = self._getLexJob(revision) if useLexer else None
@@ -378,55 +396,104 @@ class BlameRevision(RepoTask):
             blameWindow.textEdit.highlighter.installLexJob(lexJob)
             blameWindow.textEdit.highlighter.rehighlight()
 
-        blameWindow.busySpinner.stop()
-        blameWindow.syncNavButtons()
-
         # Refresh search term now that the document has changed
         blameWindow.textEdit.searchBar.reevaluateSearchTerm()
 
-    def _annotate(self, revision: Revision, blameModel: BlameModel):
-        assert not revision.isAnnotated(), "node annotation already built"
+        return oldTopBlock
 
-        # Initialize list with a dummy line #0 so effective numbering can start at 1
-        dummyLine0 = Revision.BlameLine(revision.commitId, 0)
-        revision.blameLines.append(dummyLine0)
+    @staticmethod
+    def _transposeScrollPosition(revision: Revision, previousRevision: Revision, topBlock: int, blameWindow: BlameWindow):
+        # Figure out which line number (QTextBlock) to scroll to.
+        # If the revision is still being annotated, keep the raw line number.
+        if revision.isAnnotated():  # Attempt to restore position across files
+            try:
+                oldLine = previousRevision.lineIdentity(1 + topBlock)
+                topBlock = revision.findLine(oldLine, topBlock) - 1
+            except (IndexError,  # Zero lines in annotatedFile ("File deleted in commit" notice)
+                    ValueError):  # Could not findLineByReference
+                pass  # default to raw line number already stored in topBlock
+
+        blockPosition = blameWindow.textEdit.document().findBlockByNumber(topBlock).position()
+        blameWindow.textEdit.restoreScrollPosition(blockPosition)
+
+    def _beginAnnotation(self, revision: Revision, blameModel: BlameModel):
+        """
+        Load the file's text and mark all of its lines as pending.
+        """
+
+        if revision.status == GitStatus.Deleted:
+            revision.fullText = None
+            lineCount = 0
+        else:
+            if revision.commitId == UC_FAKEID:
+                with open(self.repo.in_workdir(revision.path), "rb") as file:
+                    data = file.read()
+            else:
+                tree = self.repo.peel_commit(revision.commitId).tree
+                data = tree[revision.path].peel(Blob).data
+
+            # Similar to git's buffer_is_binary
+            revision.binary = b"\0" in data[:8000]
+            revision.fullText = None if revision.binary else data.decode("utf-8", errors="replace")
+
+            lineCount = data.count(b"\n")
+            if data and not data.endswith(b"\n"):
+                lineCount += 1
+
+        dummyKey = blameModel.revList.commitKey(revision.commitId)
+        revision.beginAnnotation(lineCount, dummyKey)
+        revision.indexHunks(blameModel.revList)
 
+    def _annotate(self, revision: Revision, blameModel: BlameModel, blameWindow: BlameWindow):
         if revision.status == GitStatus.Deleted:
+            revision.blameComplete = True
             return
 
-        driver = yield from self.flowCallGit(
+        revList = blameModel.revList
+        gutter = blameWindow.textEdit.gutter
+        parser = IncrementalBlameParser()
+        keysByHash: dict[str, int] = {}
+        refreshTimer = QElapsedTimer()
+        refreshTimer.start()
+
+        driver = self.createGitProcess(
             "blame",
-            "--porcelain",
+            "--incremental",
             *argsIf(revision.commitId != UC_FAKEID, str(revision.commitId)),
             "-S", blameModel.revsFile.fileName(),
             "--",
             revision.path)
 
-        stdout = driver.stdoutScrollback()
-
-        allLines = []
-        binaryCheckChars = 8000  # similar to git's buffer_is_binary
-
-        for hexHash, originalLineNumber, lineText in parseGitBlame(stdout):
-            oid = Oid(hex=hexHash)
-            annotatedLine = Revision.BlameLine(oid, originalLineNumber)
-            revision.blameLines.append(annotatedLine)
-
-            if revision.binary:
-                continue
-
-            allLines.append(lineText)
-
-            if binaryCheckChars < 0:
-                pass
-            elif lineText.find("\0", 0, binaryCheckChars) >= 0:
-                revision.binary = True
-                allLines.clear()  # don't care about the text anymore
-            else:
-                binaryCheckChars -= len(lineText)
-
-        if not revision.binary:
-            revision.fullText = "".join(allLines)
+        # beginAnnotation replaces the arrays, so if this revision is blamed
+        # again after this task was killed, ignore any leftover output from
+        # this task's process.
+        blameCommits = revision.blameCommits
+
+        def consumeOutput(final=False):
+            data = driver.readAllStandardOutput().data()
+            if revision.blameCommits is not blameCommits:
+                return
+
+            for hexHash, originalLineNumber, lineNumber, count in parser.feed(data):
+                try:
+                    key = keysByHash[hexHash]
+                except KeyError:
+                    key = revList.commitKey(Oid(hex=hexHash))
+                    keysByHash[hexHash] = key
+                revision.annotateLines(key, originalLineNumber, lineNumber, count)
+
+            # Don't reindex the hunks every time git emits an entry
+            if final or refreshTimer.hasExpired(BlameRevision.RefreshInterval):
+                revision.indexHunks(revList)
+                gutter.update()
+                refreshTimer.restart()
+
+        driver.readyReadStandardOutput.connect(consumeOutput)
+        yield from self.flowStartProcess(driver)
+        driver.readyReadStandardOutput.disconnect(consumeOutput)
+
+        consumeOutput(final=True)
+        revision.blameComplete = True
 
     @staticmethod
     def _getLexJob(revision: Revision) -> LexJob | None:
@@ -7,10 +7,12 @@
 import logging
 
 from gitfourchette.forms.newbranchdialog import NewBranchDialog
+from gitfourchette.forms.recallcommitdialog import RecallCommitDialog
 from gitfourchette.forms.resetheaddialog import ResetHeadDialog
 from gitfourchette.forms.textinputdialog import TextInputDialog
 from gitfourchette.gitdriver import argsIf
 from gitfourchette.localization import *
+from gitfourchette.lostcommits import LostCommitIndex
 from gitfourchette.nav import NavLocator
 from gitfourchette.porcelain import *
 from gitfourchette.qt import *
@@ -651,16 +653,13 @@ class MergeBranch(RepoTask):
 
 class RecallCommit(RepoTask):
     def flow(self):
-        dlg = TextInputDialog(
-            self.parentWidget(),
-            _("Recall lost commit"),
-            _("If you know the hash of a commit that isn’t part of any branches anymore, "
-              "{app} will try to recall it for you.", app=qAppName()))
-        dlg.okButton.setText(_("Recall"))
+        yield from self.flowIndexLostCommits()
+
+        dlg = RecallCommitDialog(self.parentWidget(), self.repoModel.lostCommitIndex)
 
         yield from self.flowDialog(dlg)
         dlg.deleteLater()
-        needle = dlg.lineEdit.text()
+        needle = dlg.lineEdit.text().strip()
 
         yield from self.flowEnterWorkerThread()
         self.epilog.effects |= TaskEffects.Refs
@@ -670,3 +669,25 @@ class RecallCommit(RepoTask):
         branchName = withUniqueSuffix(branchName, self.repo.listall_branches())
         self.repo.create_branch_from_commit(branchName, commit.id)
         self.epilog.jumpTo = NavLocator.inCommit(commit.id)
+
+    def flowIndexLostCommits(self):
+        """
+        Refresh the RepoModel's index of lost commits. Rather than running
+        'git fsck', list the commits in the object store (packs and loose
+        objects alike) and subtract everything that's reachable from a ref.
+        """
+        catFileDriver = yield from self.flowCallGit(
+            "cat-file", "--batch-all-objects", "--unordered",
+            "--batch-check=%(objecttype) %(objectname)")
+
+        # Stashes are reachable through the stash reflog rather than refs
+        stashIds = [str(oid) for oid in self.repoModel.stashes]
+        revListDriver = yield from self.flowCallGit("rev-list", "--all", *stashIds)
+
+        yield from self.flowEnterWorkerThread()
+        with Benchmark("Index lost commits"):
+            allCommits = LostCommitIndex.parseBatchCheck(catFileDriver.stdoutScrollback())
+            reachableCommits = set(revListDriver.stdoutScrollback().split())
+            reflogTips = LostCommitIndex.walkReflogs(self.repo)
+            self.repoModel.lostCommitIndex.update(self.repo, allCommits, reachableCommits, reflogTips)
+        yield from self.flowEnterUiThread()
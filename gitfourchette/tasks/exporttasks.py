@@ -4,25 +4,39 @@
 # For full terms, see the included LICENSE file.
 # -----------------------------------------------------------------------------
 
+import os
 from pathlib import Path
 
 from gitfourchette.gitdriver import GitDelta, GitStatus, GitDriver
 from gitfourchette.localization import *
 from gitfourchette.porcelain import *
+from gitfourchette.qt import *
 from gitfourchette.tasks.repotask import AbortTask, RepoTask, TaskEffects
 from gitfourchette.toolbox import *
 
 
-def savePatch(task: RepoTask, patch: str, fileName="") -> RepoTask.Flow[str]:
-    if not patch:
-        raise AbortTask(_("Nothing to export. The patch is empty."), icon="information")
-
+def flowAskPatchPath(task: RepoTask, fileName="") -> RepoTask.Flow[str]:
     # Sanitize filename
     for c in "?/\\*~<>|:":
         fileName = fileName.replace(c, "_")
 
     qfd = PersistentFileDialog.saveFile(task.parentWidget(), "SaveFile", task.name(), fileName)
     savePath = yield from task.flowFileDialog(qfd)
+    return savePath
+
+
+def reportPatchSaved(task: RepoTask, savePath: str):
+    if task.repo.is_in_workdir(savePath):
+        task.epilog.effects |= TaskEffects.Workdir  # invalidate workdir if saved file to it
+
+    task.epilog.status = _("Patch saved as: {0}", tquo(compactPath(savePath)))
+
+
+def savePatch(task: RepoTask, patch: str, fileName="") -> RepoTask.Flow[str]:
+    if not patch:
+        raise AbortTask(_("Nothing to export. The patch is empty."), icon="information")
+
+    savePath = yield from flowAskPatchPath(task, fileName)
 
     yield from task.flowEnterWorkerThread()
     # Write patches verbatim: force UTF-8 (not the locale encoding, which fails
@@ -30,10 +44,7 @@ def savePatch(task: RepoTask, patch: str, fileName="") -> RepoTask.Flow[str]:
     # translation corrupts --binary base85 payloads and can break git apply).
     Path(savePath).write_text(patch, encoding="utf-8", newline="\n")
 
-    if task.repo.is_in_workdir(savePath):
-        task.epilog.effects |= TaskEffects.Workdir  # invalidate workdir if saved file to it
-
-    task.epilog.status = _("Patch saved as: {0}", tquo(compactPath(savePath)))
+    reportPatchSaved(task, savePath)
     return savePath
 
 
@@ -112,25 +123,41 @@ class ExportWorkdirAsPatch(RepoTask):
 
 
 class ExportPatchCollection(RepoTask):
+    MaxFileNameStems = 5
+
     def flow(self, deltas: list[GitDelta]):
+        # Compose filename from the first few file name stems
         names = []
-        patches = []
-
-        for delta in deltas:
-            # Get filename stem
+        for delta in deltas[:self.MaxFileNameStems]:
             file = delta.old if delta.status == GitStatus.Deleted else delta.new
-            name = Path(file.path).stem
-            names.append(name)
+            names.append(Path(file.path).stem)
+        if len(deltas) > self.MaxFileNameStems:
+            names.append("…")
+        fileName = ", ".join(names) + ".patch"
 
-            # Get patch (run 'git diff')
-            tokens = GitDriver.buildDiffCommand(delta)
-            driver = yield from self.flowCallGit(*tokens, autoFail=False)
-            patch = driver.stdoutScrollback()
-            patches.append(patch)
+        savePath = yield from flowAskPatchPath(self, fileName)
 
-        # Compose patch and filename
-        assert all(not patch or patch.endswith("\n") for patch in patches)
-        composed = "".join(patches)
-        fileName = ", ".join(names) + ".patch"
+        # Cover the deltas with as few 'git diff' calls as possible, and stream
+        # git's output straight into the patch file instead of holding every
+        # patch in memory. (Don't touch stdout: git writes raw bytes, which
+        # keeps binary patches and line endings intact.)
+        batches = GitDriver.buildDiffCommandBatches(deltas)
+        numDone = 0
+
+        with open(savePath, "wb"):  # truncate
+            pass
+
+        for tokens, numDeltas in batches:
+            driver = self.createGitProcess(*tokens)
+            driver.setStandardOutputFile(savePath, QIODevice.OpenModeFlag.Append)
+            if len(batches) > 1:
+                progressText = _("Exporting file {0} of {1}…", numDone + 1, len(deltas))
+                driver.batchProgress = (progressText, numDone, len(deltas))
+            yield from self.flowStartProcess(driver, autoFail=False)
+            numDone += numDeltas
+
+        if os.path.getsize(savePath) == 0:
+            os.unlink(savePath)
+            raise AbortTask(_("Nothing to export. The patch is empty."), icon="information")
 
-        yield from savePatch(self, composed, fileName)
+        reportPatchSaved(self, savePath)
@@ -123,6 +123,9 @@ def loadWorkdir(task: RepoTask, allowWriteIndex: bool):
     repoModel.workdirNumChanges = numEntries
     repoModel.workdirStatusReady = True
 
+    # Patches involving the workdir or the index may be stale now
+    repoModel.patchCache.evictWorkdir()
+
     # Update pathspec filter
     cpf = repoModel.commitPathspecFilter
     if not cpf.needle:
@@ -140,6 +143,32 @@ def loadWorkdir(task: RepoTask, allowWriteIndex: bool):
     repoModel.repo.refresh_index()
 
 
+def loadCommitDiff(task: RepoTask, diffAB: tuple[Oid | None, Oid]) -> RepoTask.Flow[list[GitDelta]]:
+    """
+    Get the GitDeltas between two commits, preferably from the RepoModel's
+    commit diff cache. On a cache miss, run 'git diff --raw' and cache the
+    results.
+    """
+
+    cache = task.repoModel.commitDiffCache
+    cache.syncOptions(task.repo)
+
+    if diffAB in cache:
+        return cache.get(diffAB)
+
+    tokens = GitDriver.buildDiffRawCommand(diffAB)
+    driver = yield from task.flowCallGit(*tokens)
+    deltas = driver.readDiffRawZ()
+
+    # Fill out source commits
+    for d in deltas:
+        d.old.sourceCommit = diffAB[0]
+        d.new.sourceCommit = diffAB[1]
+
+    cache.put(diffAB, deltas)
+    return deltas
+
+
 class Jump(RepoTask):
     """
     Single entry point to navigate to any NavLocator in a repository.
@@ -177,6 +206,14 @@ class Jump(RepoTask):
         if locator.hasFlags(NavFlags.ActivateWindow):  # initial locator!
             self.rw.activateWindow()
 
+        # Warm up the commit diff cache for the commits around this one
+        if result.locator.context == NavContext.COMMITTED:
+            self.rw.schedulePrefetchCommitDiffs()
+
+        # Warm up the patch cache for the files around this one
+        if isinstance(result.document, DiffDocument):
+            self.rw.schedulePrefetchPatches()
+
     def loadResult(self, locator: NavLocator) -> RepoTask.Flow[Result]:
         rw = self.rw
 
@@ -473,14 +510,7 @@ class Jump(RepoTask):
             diffAB = locator.commitDiffAB()
             if not diffAB:
                 diffAB = commit_diff_pair(commit)
-            tokens = GitDriver.buildDiffRawCommand(diffAB)
-            driver = yield from self.flowCallGit(*tokens)
-            deltas = driver.readDiffRawZ()
-
-            # Fill out source commits
-            for d in deltas:
-                d.old.sourceCommit = diffAB[0]
-                d.new.sourceCommit = diffAB[1]
+            deltas = yield from loadCommitDiff(self, diffAB)
 
             summary = self.repo.peel_commit(locator.commit).message.strip()
 
@@ -696,6 +726,31 @@ class JumpToHEAD(RepoTask):
         yield from self.flowSubtask(Jump, locator)
 
 
+class PrefetchCommitDiffs(RepoTask):
+    """
+    Load the file lists of the commits immediately above and below the
+    selected commit into the commit diff cache, so that stepping through the
+    graph doesn't have to wait on 'git diff'.
+    """
+
+    def isFreelyInterruptible(self) -> bool:
+        return True
+
+    def broadcastProcesses(self) -> bool:
+        return False
+
+    def flow(self, oids: list[Oid]):
+        self.epilog.effects = TaskEffects.Nothing
+
+        for oid in oids:
+            try:
+                commit = self.repo.peel_commit(oid)
+            except (KeyError, ValueError):
+                continue
+            diffAB = commit_diff_pair(commit)
+            yield from loadCommitDiff(self, diffAB)
+
+
 class RefreshRepo(RepoTask):
     @staticmethod
     def canKill_static(task: RepoTask):
@@ -9,15 +9,16 @@ import logging
 from gitfourchette import settings
 from gitfourchette.codeview.codewindow import CodeWindow
 from gitfourchette.diffview.diffdocument import DiffDocument
+from gitfourchette.diffview.patchcache import PatchCache
 from gitfourchette.forms.repostub import RepoStub
 from gitfourchette.gitdriver import GitDelta, GitDeltaFile, GitStatus, GitConflict, GitDriver
 from gitfourchette.gitdriver.lfspointer import LfsObjectCacheMissingError
 from gitfourchette.gitdriver.parsers import parseAheadBehind
+from gitfourchette.graphview.commitlogmodel import SpecialRow
 from gitfourchette.syntax.lexercache import LexerCache
 from gitfourchette.syntax.lexjob import LexJob
 from gitfourchette.syntax.lexjobcache import LexJobCache
 from gitfourchette.diffview.specialdiff import SpecialDiffError, ImageDelta
-from gitfourchette.graph import GraphBuildLoop
 from gitfourchette.localization import *
 from gitfourchette.nav import NavLocator, NavFlags, NavContext
 from gitfourchette.porcelain import *
@@ -159,21 +160,12 @@ class PrimeRepo(RepoTask):
                 progress = .5 + .5 * progress  # Fill up the right half of the progress bar.
             self.repoStub.progressFraction.emit(progress)
 
-        hideSeeds = repoModel.getHiddenTips()
-        localSeeds = repoModel.getLocalTips()
-        buildLoop = GraphBuildLoop(heads=repoModel.getKnownTips(), hideSeeds=hideSeeds, localSeeds=localSeeds)
-        buildLoop.onKeyframe = reportGraphProgress
-        buildLoop.sendAll(commitSequence)
+        repoModel.buildGraph(commitSequence, truncatedHistory, onKeyframe=reportGraphProgress)
         repoStub.progressFraction.emit(1.0)
 
-        graph = buildLoop.graph
-        repoModel.hiddenCommits = buildLoop.hiddenCommits
-        repoModel.foreignCommits = buildLoop.foreignCommits
-        repoModel.commitSequence = commitSequence
-        repoModel.truncatedHistory = truncatedHistory
-        repoModel.graph = graph
-        repoModel.hideSeeds = hideSeeds
-        repoModel.localSeeds = localSeeds
+        if truncatedHistory:
+            # Keep the walker where it stopped so that ExtendHistory can resume it
+            repoModel.setTruncatedWalker(walker)
 
         # ---------------------------------------------------------------------
         # RETURN TO UI THREAD
@@ -238,11 +230,102 @@ class PrimeRepo(RepoTask):
         super().onError(exc)
 
 
+class ExtendHistory(RepoTask):
+    """
+    Load more commits into a truncated history without reloading the repo.
+
+    The walk resumes where PrimeRepo (or the previous ExtendHistory) left off,
+    and the new commits are woven into the bottom of the existing graph.
+    """
+
+    def flow(self, maxCommits: int = -1):
+        repoModel = self.repoModel
+        rw = self.rw
+        locale = QLocale()
+
+        # It's not necessary to refresh anything else
+        self.epilog.effects = TaskEffects.Nothing
+
+        if maxCommits < 0:
+            maxCommits = repoModel.nextTruncationThreshold
+        if maxCommits == 0:  # 0 means infinity
+            maxCommits = 2**63  # ought to be enough
+
+        if not repoModel.truncatedHistory or maxCommits <= repoModel.numRealCommits:
+            return
+
+        oldBottomCommit = repoModel.commitSequence[-1].id
+
+        # ---------------------------------------------------------------------
+        # Walk more commits on the worker thread
+
+        yield from self.flowEnterWorkerThread()
+
+        walker = repoModel.resumeWalker()
+        resume = walker is not None
+
+        if resume:
+            newCommits = []
+            numCommits = repoModel.numRealCommits
+        else:
+            logger.info("Commit sequence has drifted from a fresh walk; rebuilding the graph from scratch")
+            walker = repoModel.primeWalker()
+            newCommits = [repoModel.uncommittedChangesMockCommit()]
+            numCommits = 0
+
+        truncatedHistory = False
+        for commit in walker:
+            newCommits.append(commit)
+            numCommits += 1
+            if numCommits >= maxCommits:
+                truncatedHistory = True
+                break
+
+        # ---------------------------------------------------------------------
+        # Weave the graph on the UI thread.
+        # We don't want GraphView to read an incomplete graph while repainting.
+
+        yield from self.flowEnterUiThread()
+
+        graphView = rw.graphView
+        numOldRows = len(repoModel.commitSequence)
+
+        with QSignalBlockerContext(graphView):
+            if resume:
+                repoModel.appendToGraph(newCommits, truncatedHistory)
+                graphView.clModel.appendCommitSequence(numOldRows)
+            else:
+                repoModel.buildGraph(newCommits, truncatedHistory)
+                graphView.clModel.resetCommitSequence()
+            graphView.clFilter.updateHiddenCommits()
+
+        repoModel.setTruncatedWalker(walker if truncatedHistory else None)
+
+        logger.info(f"{repoModel.shortName}: loaded {numCommits} commits")
+        if truncatedHistory:
+            self.epilog.status = _("{0} commits loaded (truncated log).", locale.toString(numCommits))
+        else:
+            self.epilog.status = _("{0} commits total.", locale.toString(numCommits))
+            settings.history.setRepoNumCommits(repoModel.repo.workdir, numCommits)
+            settings.history.write()
+
+        # The selection is preserved if the new rows could be appended to the
+        # graph. But if the 'truncated history' row was selected, it's stale
+        # now, so jump back to what used to be the last commit.
+        locator = rw.navLocator
+        if locator.context == NavContext.SPECIAL and locator.path == str(SpecialRow.TruncatedHistory):
+            self.epilog.jumpTo = NavLocator.inCommit(oldBottomCommit)
+        elif not resume:
+            self.epilog.jumpTo = locator
+
+
 class LoadPatch(RepoTask):
     def canKill(self, task: RepoTask):
         return isinstance(task, LoadPatch)
 
-    def flow(self, delta: GitDelta, locator: NavLocator):
+    def flow(self, delta: GitDelta, locator: NavLocator, prefetch: bool = False):
+        self.cacheKey: PatchCache.KeyType = ()
+
         try:
             diff = yield from self._getPatch(delta, locator)
         except LfsObjectCacheMissingError as lfsMissing:
@@ -263,11 +346,31 @@ class LoadPatch(RepoTask):
             if not delta.new.lfs and not delta.new.isIdValid():
                 delta.new.id = diff.newHash
 
-            # Prime lexer
-            diff.oldLexJob, diff.newLexJob = self._primeLexJobs(delta)
+            # Prime lexer (lean documents don't get syntax highlighting)
+            if not diff.lean:
+                diff.oldLexJob, diff.newLexJob = self._primeLexJobs(delta)
+
+            # Keep prefetched document around until the user selects this file
+            if prefetch:
+                self.repoModel.patchCache.putDocument(self.cacheKey, diff)
 
         return diff
 
+    def _patchCacheKey(self, delta: GitDelta, locator: NavLocator) -> PatchCache.KeyType:
+        if locator.context == NavContext.UNSTAGED:
+            # The workdir blob isn't hashed yet, so identify it by its stat
+            newKey = delta.new.stat(self.repo)
+        else:
+            newKey = str(delta.new.id)
+        return (
+            locator.contextKey,
+            delta.old.path,
+            delta.new.path,
+            str(delta.old.id),
+            newKey,
+            locator.hasFlags(NavFlags.AllowLargeFiles),
+        )
+
     def _getPatch(
             self,
             delta: GitDelta,
@@ -341,9 +444,24 @@ class LoadPatch(RepoTask):
         else:
             tokens = GitDriver.buildDiffCommand(delta, binary=False, forDisplay=True)
 
-        # Run diff command
-        driver = yield from self.flowCallGit(*tokens, autoFail=False)
-        patch = driver.stdoutScrollback()
+        # Skip 'git diff' if we've already seen this exact patch recently
+        patchCache = self.repoModel.patchCache
+        self.cacheKey = (*self._patchCacheKey(delta, locator), *tokens)
+
+        prefetchedDiff = patchCache.takeDocument(self.cacheKey)
+        if prefetchedDiff is not None:
+            if locator.context == NavContext.UNSTAGED:
+                delta.new.diskStat = delta.new.stat(self.repo)
+            return prefetchedDiff
+
+        try:
+            patch = patchCache.get(self.cacheKey).patch
+            stderr = ""
+        except KeyError:
+            # Run diff command
+            driver = yield from self.flowCallGit(*tokens, autoFail=False)
+            patch = driver.stdoutScrollback()
+            stderr = driver.stderrScrollback()
 
         # Don't display large diffs (legacy pygit2 version)
         # TODO: Remove this once we drop support for pygit2 <= 1.19.1
@@ -366,11 +484,11 @@ class LoadPatch(RepoTask):
         try:
             diff = DiffDocument.fromPatch(patch, maxLineLength)
             diff.document.moveToThread(QApplication.instance().thread())
+            patchCache.put(self.cacheKey, patch, isWorkdir=locator.context.isWorkdir())
             return diff
         except DiffDocument.BinaryError:
             return SpecialDiffError.binaryDiff(self.repo, delta, locator)
         except DiffDocument.NoChangeError:
-            stderr = driver.stderrScrollback()
             return SpecialDiffError.noChange(self.repo, delta, stderr)
         except DiffDocument.VeryLongLinesError:
             loadAnywayLoc = locator.withExtraFlags(NavFlags.AllowLargeFiles)
@@ -434,6 +552,25 @@ class LoadPatch(RepoTask):
         return job
 
 
+class PrefetchPatches(RepoTask):
+    """
+    Build the DiffDocuments of the files surrounding the current selection
+    ahead of time, while the user reads the current file.
+    """
+
+    def isFreelyInterruptible(self) -> bool:
+        return True
+
+    def broadcastProcesses(self) -> bool:
+        return False
+
+    def flow(self, deltas: list[GitDelta], locators: list[NavLocator]):
+        self.epilog.effects = TaskEffects.Nothing
+
+        for delta, locator in zip(deltas, locators, strict=True):
+            yield from self.flowSubtask(LoadPatch, delta, locator, prefetch=True)
+
+
 class LoadPatchInNewWindow(RepoTask):
     def flow(self, delta: GitDelta, locator: NavLocator):
         if CodeWindow.activateExistingWindow(locator):
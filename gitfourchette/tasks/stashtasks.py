@@ -47,12 +47,6 @@ assert _statusZero == 0
 
 
 def backupStash(repo: Repo, stashCommitId: Oid):
-    try:
-        trashFile = Trash.instance().newFile(repo.workdir, ext=".txt", originalPath="DELETED_STASH")
-    except Trash.BackupSkipped as ex:
-        logger.warning(f"Stash backup skipped: {ex}")
-        return
-
     text = F"""\
 To recover this stash, paste the hash below into "Repo > Recall Lost Commit" in {qAppName()}:
 
@@ -65,8 +59,10 @@ Original stash message below:
 {repo.peel_commit(stashCommitId).message}
 """
 
-    with open(trashFile, "w", encoding="utf-8") as f:
-        f.write(text)
+    try:
+        Trash.instance().backupText(repo.workdir, text, "DELETED_STASH")
+    except Trash.BackupSkipped as ex:
+        logger.warning(f"Stash backup skipped: {ex}")
 
 
 class NewStash(RepoTask):
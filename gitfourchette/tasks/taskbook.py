@@ -56,6 +56,7 @@ class TaskBook:
             tasks.ExportPatchCollection: _("Export patch file"),
             tasks.ExportStashAsPatch: _("Export stash as patch file"),
             tasks.ExportWorkdirAsPatch: _("Export changes as patch file"),
+            tasks.ExtendHistory: _("Load more commits"),
             tasks.FastForwardBranch: _("Fast-forward branch"),
             tasks.FetchRemotes: _("Fetch remote branches"),
             tasks.FetchRemoteBranch: _("Fetch remote branch"),
@@ -80,6 +81,8 @@ class TaskBook:
             tasks.OpenInDiffTool: _("Open in external diff tool"),
             tasks.OpenMergeTool: _("Open in merge tool"),
             tasks.OpenRevisionInEditor: _("Open file revision"),
+            tasks.PrefetchCommitDiffs: _("Prefetch commit diffs"),
+            tasks.PrefetchPatches: _("Prefetch diffs"),
             tasks.QueryCommitsTouchingPath: _("Find commits touching path"),
             tasks.PullBranch: _("Pull remote branch"),
             tasks.PushBranch: _("Push branch"),
@@ -4,30 +4,120 @@
 # For full terms, see the included LICENSE file.
 # -----------------------------------------------------------------------------
 
+"""
+Last-resort backups of discarded changes.
+
+The trash is a small content-addressed store: discarded content is compressed
+with zlib and stored once under its SHA-256 digest (so that discarding the same
+file over and over doesn't fill up the trash with identical copies), and a
+manifest keeps track of what was discarded, when, and from which working
+directory.
+"""
+
 from __future__ import annotations
 
+import dataclasses
+import enum
+import hashlib
+import json
 import logging
+import os
 import shutil
+import tarfile
+import time
+import zlib
 from pathlib import Path
-from tarfile import TarFile
 
 import gitfourchette.pycompat  # noqa: F401 - Path.is_file(follow_symlinks=...) for Python 3.12
 from gitfourchette import settings
 from gitfourchette.qt import *
-from gitfourchette.toolbox import withUniqueSuffix
 
 logger = logging.getLogger(__name__)
 
 
+class TrashItemKind(enum.StrEnum):
+    File = "file"
+    Symlink = "symlink"
+    Patch = "patch"
+    Tarball = "tar"
+    Text = "text"
+
+
+@dataclasses.dataclass(frozen=True)
+class TrashItem:
+    path: str
+    "Original path of the discarded file, relative to the working directory."
+
+    kind: TrashItemKind
+
+    digest: str
+    "SHA-256 of the uncompressed content; names the object in the content store."
+
+    size: int
+    "Uncompressed size in bytes."
+
+    storedSize: int
+    "Compressed size of the object on disk."
+
+    def suggestedFileName(self) -> str:
+        name = Path(self.path).name or "untitled"
+        if self.kind == TrashItemKind.Patch:
+            name += ".patch"
+        elif self.kind == TrashItemKind.Text:
+            name += ".txt"
+        return name
+
+
+@dataclasses.dataclass(frozen=True)
+class TrashEntry:
+    id: str
+    "Unique identifier, sortable in chronological order."
+
+    time: int
+    "When the changes were discarded (seconds since epoch)."
+
+    workdir: str
+    "Working directory that the items were discarded from."
+
+    items: tuple[TrashItem, ...]
+
+    def toJson(self) -> str:
+        obj = dataclasses.asdict(self)
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def fromJson(line: str) -> TrashEntry:
+        obj = json.loads(line)
+        items = tuple(TrashItem(
+            path=i["path"],
+            kind=TrashItemKind(i["kind"]),
+            digest=i["digest"],
+            size=i["size"],
+            storedSize=i["storedSize"],
+        ) for i in obj["items"])
+        return TrashEntry(id=obj["id"], time=obj["time"], workdir=obj["workdir"], items=items)
+
+
 class Trash:
     DirectoryName = "trash"
-    QDateTimeFormat = "yyyyMMdd-HHmmss"
-    MaxUniqueSuffix = 99
+    ObjectsDirectoryName = "objects"
+    ManifestName = "manifest.jsonl"
+    IdDateFormat = "%Y%m%d-%H%M%S"
+    CompressionLevel = 6
+    ChunkSize = 1024 * 1024
 
     _instance: Trash | None = None
 
     trashDir: Path
-    trashFiles: list[Path]
+
+    entries: list[TrashEntry]
+    "Contents of the manifest, most recent first."
+
+    objectRefs: dict[str, int]
+    "Number of manifest items referring to each object."
+
+    storedBytes: int
+    "Total size of the objects on disk (each object counted once)."
 
     class BackupSkipped(Exception):
         pass
@@ -44,8 +134,11 @@ class Trash:
             cacheDir = Path(qTempDir(), "fake_cache_directory")
 
         self.trashDir = Path(cacheDir, Trash.DirectoryName)
-        self.trashFiles = []
-        self.refreshFiles()
+        self.entries = []
+        self.objectRefs = {}
+        self.storedBytes = 0
+        self._lastId = ""
+        self.reload()
 
     @classmethod
     def instance(cls) -> Trash:
@@ -55,11 +148,11 @@ class Trash:
 
     @classmethod
     def enabled(cls) -> bool:
-        return cls.maxFileCount() > 0
+        return cls.maxBytes() > 0
 
     @classmethod
-    def maxFileCount(cls) -> int:
-        return settings.prefs.maxTrashFiles
+    def maxBytes(cls) -> int:
+        return settings.prefs.maxTrashMB * 1024 * 1024
 
     @classmethod
     def fileSizeLimit(cls) -> int:
@@ -74,57 +167,175 @@ class Trash:
         if not cls.enabled():
             raise Trash.BackupSkipped("trash disabled")
 
+    @property
+    def objectsDir(self) -> Path:
+        return Path(self.trashDir, Trash.ObjectsDirectoryName)
+
+    @property
+    def manifestPath(self) -> Path:
+        return Path(self.trashDir, Trash.ManifestName)
+
+    def objectPath(self, digest: str) -> Path:
+        return Path(self.objectsDir, digest[:2], digest[2:])
+
     def exists(self) -> bool:
         return self.trashDir.is_dir()
 
-    def pathIsTrashManaged(self, p: Path) -> bool:
-        if not p.is_relative_to(self.trashDir):
-            return False
-        return p.is_file(follow_symlinks=False) or p.is_symlink()
-
-    def refreshFiles(self):
-        self.trashFiles.clear()
-        if self.exists():
-            self.trashFiles.extend(p for p in self.trashDir.iterdir() if self.pathIsTrashManaged(p))
-            self.trashFiles.sort(reverse=True)
-
-    def makeRoom(self, maxFiles: int):
-        while len(self.trashFiles) > maxFiles:
-            f = self.trashFiles.pop()
-            if self.pathIsTrashManaged(f):
-                logger.debug(f"Deleting trash file {f}")
-                f.unlink()
-
-    def newFile(self, workdir: str, ext: str = "", originalPath: str = "") -> Path:
-        self.ensureTrashEnabled()
+    # -------------------------------------------------------------------------
+    # Manifest
 
-        maxFiles = max(0, self.maxFileCount() - 1)
-        self.makeRoom(maxFiles)
+    def reload(self):
+        self.entries.clear()
+        self.objectRefs.clear()
+        self.storedBytes = 0
 
+        try:
+            with open(self.manifestPath, encoding="utf-8") as manifest:
+                lines = manifest.readlines()
+        except FileNotFoundError:
+            return
+
+        for line in lines:
+            try:
+                entry = TrashEntry.fromJson(line)
+            except (ValueError, KeyError, TypeError) as exc:
+                logger.warning(f"Skipping corrupt trash manifest line: {exc}")
+                continue
+            self._track(entry)
+            self.entries.append(entry)
+
+        self.entries.reverse()
+        self._lastId = max((e.id for e in self.entries), default="")
+
+    def _track(self, entry: TrashEntry):
+        """ Account for the objects referenced by a new entry. Caller must insert the entry. """
+        for item in entry.items:
+            refs = self.objectRefs.get(item.digest, 0)
+            if refs == 0:
+                self.storedBytes += item.storedSize
+            self.objectRefs[item.digest] = refs + 1
+
+    def _untrack(self, entry: TrashEntry):
+        """ Drop references to the objects of an entry, deleting the objects that aren't used anymore. """
+        for item in entry.items:
+            refs = self.objectRefs[item.digest] - 1
+            if refs > 0:
+                self.objectRefs[item.digest] = refs
+                continue
+            del self.objectRefs[item.digest]
+            self.storedBytes -= item.storedSize
+            logger.debug(f"Deleting trash object {item.digest}")
+            self.objectPath(item.digest).unlink(missing_ok=True)
+
+    def _writeManifest(self):
+        tempPath = self.manifestPath.with_suffix(".tmp")
+        with open(tempPath, "w", encoding="utf-8", newline="\n") as manifest:
+            manifest.writelines(entry.toJson() + "\n" for entry in reversed(self.entries))
+        tempPath.replace(self.manifestPath)
+
+    def _newId(self, now: float) -> str:
+        stem = time.strftime(Trash.IdDateFormat, time.localtime(now))
+        uniqueId = stem
+        suffix = 1
+        while uniqueId <= self._lastId:
+            uniqueId = f"{stem}.{suffix:03}"
+            suffix += 1
+        self._lastId = uniqueId
+        return uniqueId
+
+    def addEntry(self, workdir: str, items: list[TrashItem]) -> TrashEntry:
+        """
+        Record an operation's backed-up items in the manifest,
+        then evict old entries if the trash is over budget.
+        """
         self.trashDir.mkdir(parents=True, exist_ok=True)
 
-        now = QDateTime.currentDateTime().toString(Trash.QDateTimeFormat)
-        wdID = Path(workdir).name
-        base = Path(originalPath).name
-        stem = f"{now}-{wdID}---{base}"
+        now = time.time()
+        entry = TrashEntry(id=self._newId(now), time=int(now), workdir=workdir, items=tuple(items))
+
+        self._track(entry)
+        self.entries.insert(0, entry)
+
+        with open(self.manifestPath, "a", encoding="utf-8", newline="\n") as manifest:
+            manifest.write(entry.toJson() + "\n")
+
+        self.makeRoom(self.maxBytes())
+        return entry
+
+    def makeRoom(self, maxBytes: int):
+        """
+        Evict the oldest entries until the objects fit in the given budget.
+        The most recent entry is always kept.
+        """
+        evicted = False
+        while self.storedBytes > maxBytes and len(self.entries) > 1:
+            entry = self.entries.pop()
+            logger.debug(f"Evicting trash entry {entry.id}")
+            self._untrack(entry)
+            evicted = True
+
+        if evicted:
+            self._writeManifest()
+
+    def removeEntry(self, entry: TrashEntry):
+        self.entries.remove(entry)
+        self._untrack(entry)
+        self._writeManifest()
+
+    # -------------------------------------------------------------------------
+    # Content store
+
+    def _storeStream(self, chunks) -> tuple[str, int, int]:
+        """
+        Compress a stream of byte chunks into the object store.
+        Returns the digest, the uncompressed size and the stored size.
+        """
+        self.objectsDir.mkdir(parents=True, exist_ok=True)
+        tempPath = Path(self.objectsDir, f"incoming-{os.getpid()}.tmp")
+
+        hasher = hashlib.sha256()
+        compressor = zlib.compressobj(Trash.CompressionLevel)
+        size = 0
+
+        with open(tempPath, "wb") as tempFile:
+            for chunk in chunks:
+                hasher.update(chunk)
+                size += len(chunk)
+                tempFile.write(compressor.compress(chunk))
+            tempFile.write(compressor.flush())
+
+        digest = hasher.hexdigest()
+        path = self.objectPath(digest)
 
-        # If a file exists at this path, tack a number to the end of the name.
-        uniqueName = withUniqueSuffix(
-            stem,
-            ext=ext,
-            reserved=lambda candidate: Path(self.trashDir, candidate).exists(follow_symlinks=False),
-            stop=Trash.MaxUniqueSuffix,
-            suffixFormat="({})")
+        if path.is_file():
+            # Identical content is already in the trash
+            tempPath.unlink()
+        else:
+            path.parent.mkdir(exist_ok=True)
+            tempPath.replace(path)
+
+        return digest, size, path.stat().st_size
+
+    def storeBytes(self, data: bytes, path: str, kind: TrashItemKind) -> TrashItem:
+        digest, size, storedSize = self._storeStream([data])
+        return TrashItem(path, kind, digest, size, storedSize)
 
-        path = Path(self.trashDir, uniqueName)
+    def storeFile(self, fullPath: Path, path: str, kind: TrashItemKind) -> TrashItem:
+        def readChunks():
+            with open(fullPath, "rb") as file:
+                while chunk := file.read(Trash.ChunkSize):
+                    yield chunk
 
-        # Replace existing file if withUniqueSuffix ran out of suffixes
-        path.unlink(missing_ok=True)
+        digest, size, storedSize = self._storeStream(readChunks())
+        return TrashItem(path, kind, digest, size, storedSize)
 
-        self.trashFiles.insert(0, path)
-        return path
+    def load(self, item: TrashItem) -> bytes:
+        return zlib.decompress(self.objectPath(item.digest).read_bytes())
 
-    def backupFile(self, workdir: str, originalPath: str) -> Path:
+    # -------------------------------------------------------------------------
+    # Backing up
+
+    def fileItem(self, workdir: str, originalPath: str) -> TrashItem:
         self.ensureTrashEnabled()
 
         fullPath = Path(workdir, originalPath)
@@ -136,17 +347,20 @@ class Trash:
         if self.hasFileSizeLimit() and size > self.fileSizeLimit():
             raise Trash.BackupSkipped("file too big")
 
-        # Copy new file
-        trashPath = self.newFile(workdir, originalPath=originalPath)
-        shutil.copyfile(fullPath, trashPath, follow_symlinks=False)
-        return trashPath
+        if fullPath.is_symlink():
+            target = os.fsencode(os.readlink(fullPath))
+            return self.storeBytes(target, originalPath, TrashItemKind.Symlink)
 
-    def backupPatch(self, workdir: str, text: str, originalPath: str = "") -> Path:
-        trashFile = self.newFile(workdir, ext=".patch", originalPath=originalPath)
-        trashFile.write_text(text, encoding="utf-8", newline="\n")
-        return trashFile
+        try:
+            return self.storeFile(fullPath, originalPath, TrashItemKind.File)
+        except OSError as ex:
+            raise Trash.BackupSkipped("file unreadable") from ex
 
-    def backupTree(self, workdir: str, treePath: str) -> Path:
+    def patchItem(self, text: str, originalPath: str = "") -> TrashItem:
+        self.ensureTrashEnabled()
+        return self.storeBytes(text.encode("utf-8"), originalPath, TrashItemKind.Patch)
+
+    def treeItem(self, workdir: str, treePath: str) -> TrashItem:
         self.ensureTrashEnabled()
 
         treeFullPath = Path(workdir, treePath)
@@ -165,27 +379,86 @@ class Trash:
                     if totalSize > self.fileSizeLimit():
                         raise Trash.BackupSkipped("tree too big")
 
-        # Create a tarball
-        trashFile = self.newFile(workdir, ext=".tar", originalPath=treePath)
+        # Create a tarball, then move it into the object store
+        self.objectsDir.mkdir(parents=True, exist_ok=True)
+        tarPath = Path(self.objectsDir, f"tarball-{os.getpid()}.tmp")
+        try:
+            with tarfile.TarFile(tarPath, "w") as tarball:
+                tarball.add(treeFullPath, arcname=treePath)
+            return self.storeFile(tarPath, treePath, TrashItemKind.Tarball)
+        finally:
+            tarPath.unlink(missing_ok=True)
 
-        with TarFile(trashFile, "w") as tarball:
-            tarball.add(treeFullPath, arcname=treePath)
+    def backupFile(self, workdir: str, originalPath: str) -> TrashEntry:
+        item = self.fileItem(workdir, originalPath)
+        return self.addEntry(workdir, [item])
 
-        return trashFile
+    def backupPatch(self, workdir: str, text: str, originalPath: str = "") -> TrashEntry:
+        item = self.patchItem(text, originalPath)
+        return self.addEntry(workdir, [item])
 
-    def size(self) -> tuple[int, int]:
-        size = 0
-        count = 0
+    def backupTree(self, workdir: str, treePath: str) -> TrashEntry:
+        item = self.treeItem(workdir, treePath)
+        return self.addEntry(workdir, [item])
 
-        for f in self.trashFiles:
-            if self.pathIsTrashManaged(f):
-                size += f.lstat().st_size
-                count += 1
+    def backupText(self, workdir: str, text: str, originalPath: str) -> TrashEntry:
+        self.ensureTrashEnabled()
+        item = self.storeBytes(text.encode("utf-8"), originalPath, TrashItemKind.Text)
+        return self.addEntry(workdir, [item])
+
+    # -------------------------------------------------------------------------
+    # Restoring
+
+    def restore(self, item: TrashItem, destination: Path):
+        """
+        Write an item back to disk. Tarballs are extracted into the
+        destination directory; other kinds of items are written to
+        the destination path.
+        """
+        data = self.load(item)
+
+        if item.kind == TrashItemKind.Tarball:
+            tempPath = Path(self.objectsDir, f"restore-{os.getpid()}.tmp")
+            try:
+                tempPath.write_bytes(data)
+                with tarfile.TarFile(tempPath) as tarball:
+                    tarball.extractall(destination, filter="tar")
+            finally:
+                tempPath.unlink(missing_ok=True)
+            return
+
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if destination.is_symlink():
+            destination.unlink()
+
+        if item.kind == TrashItemKind.Symlink:
+            destination.unlink(missing_ok=True)
+            destination.symlink_to(os.fsdecode(data))
+        else:
+            destination.write_bytes(data)
 
-        return size, count
+    # -------------------------------------------------------------------------
+    # Housekeeping
+
+    def size(self) -> tuple[int, int]:
+        return self.storedBytes, len(self.entries)
 
     def count(self) -> int:
-        return self.size()[1]
+        return len(self.entries)
 
     def clear(self):
-        self.makeRoom(0)
+        self.entries.clear()
+        self.objectRefs.clear()
+        self.storedBytes = 0
+        self._lastId = ""
+
+        if not self.exists():
+            return
+
+        shutil.rmtree(self.objectsDir, ignore_errors=True)
+        self.manifestPath.unlink(missing_ok=True)
+
+        # Sweep loose backups left over by older versions
+        for p in self.trashDir.iterdir():
+            if p.is_file(follow_symlinks=False) or p.is_symlink():
+                p.unlink()
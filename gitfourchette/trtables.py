@@ -439,7 +439,7 @@ def _prefKeyTable() -> dict[str, str]:
             "The verification status is materialized by a seal icon next to the author’s name:", tquo("git verify-commit")
         ) + _gpgStatusReferenceTable() + "<br>" + _("(No seal = Commit isn’t signed)"),
 
-        "maxTrashFiles": _("The trash keeps up to # discarded patches"),
+        "maxTrashMB": _("The trash may take up to # MB on disk"),
         "maxTrashFileKB": _("Patches bigger than # KB won’t be salvaged"),
         "trash_HEADER": _(
             "When you discard changes from the working directory, {app} keeps a temporary copy in a hidden "
@@ -9,6 +9,7 @@ import re
 import textwrap
 
 from gitfourchette import settings
+from gitfourchette.diffview.diffdocument import DiffDocument, DiffTextFormats
 from gitfourchette.diffview.diffview import DiffView
 from gitfourchette.nav import NavLocator
 from gitfourchette.settings import WhitespaceMode
@@ -235,10 +236,11 @@ def testBackUpDiscardedHunkInTrash(tempDir, mainWindow):
     from gitfourchette.trash import Trash
 
     trash = Trash.instance()
-    trash.refreshFiles()
-    assert len(trash.trashFiles) == 1
+    assert trash.count() == 1
+    patchPath = Path(tempDir.name, "rescued.patch")
+    trash.restore(trash.entries[0].items[0], patchPath)
     triggerMenuAction(mainWindow.menuBar(), "file/revert patch file")
-    acceptQFileDialog(rw, "patch", str(trash.trashFiles[0]))
+    acceptQFileDialog(rw, "patch", str(patchPath))
     acceptQMessageBox(rw, "do you want to revert patch file")
     assert readTextFile(f"{wd}/master.txt") == newContents
 
@@ -1232,3 +1234,70 @@ def testDiffReevaluateSearchTermAcrossDocuments(tempDir, mainWindow):
 
     rw.jump(loc3, check=True)
     waitUntilTrue(lambda: not searchBar.isRed())
+
+
+def testLeanDocumentMatchesRegularDocument(tempDir, mainWindow, monkeypatch):
+    patch = (
+        "diff --git a/f.txt b/f.txt\n"
+        "--- a/f.txt\n"
+        "+++ b/f.txt\n"
+        "@@ -1,4 +1,4 @@\n"
+        " context\n"
+        "-old 🐍 line\r\n"
+        "+new 🐍 line\r\n"
+        " more context\n"
+        "-bye\n"
+        "\\ No newline at end of file\n"
+        "+bye!\n"
+        "\\ No newline at end of file\n"
+    )
+
+    regular = DiffDocument.fromPatch(patch)
+    assert not regular.lean
+
+    monkeypatch.setattr(DiffDocument, "LeanLineThreshold", 0)
+    lean = DiffDocument.fromPatch(patch)
+    assert lean.lean
+
+    assert lean.document.toRawText() == regular.document.toRawText()
+    assert lean.document.blockCount() == regular.document.blockCount() == len(lean.lineData)
+    for leanLD, regularLD in zip(lean.lineData, regular.lineData, strict=True):
+        assert (leanLD.cursorStart, leanLD.cursorEnd) == (regularLD.cursorStart, regularLD.cursorEnd)
+        assert leanLD.trailerLength == regularLD.trailerLength
+
+    assert lean.lineBackground(0) is None
+    assert lean.lineBackground(2) == DiffTextFormats.delBF.background()
+    assert lean.lineBackground(3) == DiffTextFormats.addBF.background()
+
+
+@pytest.mark.skipif(QT5, reason="Qt 5 (deprecated) is finicky with this test, but Qt 6 is fine")
+def testStageLinesInLeanDocument(tempDir, mainWindow, monkeypatch):
+    monkeypatch.setattr(DiffDocument, "LeanLineThreshold", 0)
+
+    wd = unpackRepo(tempDir)
+    writeFile(F"{wd}/NewFile.txt", "line A\nline B\nline C\nline D\nline E")
+    rw = mainWindow.openRepo(wd)
+
+    qlvClickNthRow(rw.dirtyFiles, 0)
+    assert rw.diffView.currentDiffDocument.lean
+    assert rw.diffView.highlighter.document() is None
+    assert rw.diffView.toPlainText().startswith("@@ -0,0 +1,5 @@\nline A\n")
+
+    rw.diffView.setFocus()
+    waitUntilTrue(rw.diffView.hasFocus)
+
+    # Search still finds matches without a highlighter attached
+    searchBar = rw.diffView.searchBar
+    QTest.keySequence(rw.diffView, "Ctrl+F")
+    QTest.keyClicks(searchBar.lineEdit, "line d")
+    QTest.qWait(0)
+    assert not searchBar.isRed()
+    searchBar.ui.forwardButton.click()
+    assert rw.diffView.textCursor().selectedText() == "line D"
+
+    qteSelectBlocks(rw.diffView, 3, 4)
+    rw.diffView.stageButton.click()
+
+    stagedId = rw.repo.index["NewFile.txt"].id
+    stagedBlob = rw.repo.peel_blob(stagedId)
+    assert stagedBlob.data == b"line C\nline D\n"
@@ -24,11 +24,14 @@ from gitfourchette.forms.donateprompt import DonatePrompt
 from gitfourchette.forms.processdialog import ProcessDialog
 from gitfourchette.forms.reposettingsdialog import RepoSettingsDialog
 from gitfourchette.forms.repostub import RepoStub
+from gitfourchette.graph import GraphDiagram
 from gitfourchette.graphview.commitlogmodel import SpecialRow, CommitLogModel
 from gitfourchette.mainwindow import MainWindow
 from gitfourchette.nav import NavLocator
+from gitfourchette.repomodel import RepoModel
 from gitfourchette.settings import Session
 from gitfourchette.sidebar.sidebarmodel import SidebarItem
+from gitfourchette.toolbox import makeInternalLink
 
 
 def bringUpRepoSettings(rw):
@@ -260,6 +263,68 @@ def testTruncatedHistory(tempDir, mainWindow, method, action):
     assert not rw.diffBanner.isVisible()
 
 
+def testExtendTruncatedHistoryInPlace(tempDir, mainWindow):
+    def snapshotGraph(repoModel: RepoModel):
+        numRows = len(repoModel.commitSequence)
+        graph = repoModel.graph
+        return (
+            [c.id for c in repoModel.commitSequence],
+            {oid: int(row) for oid, row in graph.commitRows.items()},
+            set(repoModel.hiddenCommits),
+            set(repoModel.foreignCommits),
+            GraphDiagram.diagram(graph, maxRows=numRows, verbose=True),
+        )
+
+    GFApplication.applyPrefs(maxCommits=5)
+    wd = unpackRepo(tempDir)
+    rw = mainWindow.openRepo(wd)
+    assert rw.graphView.clFilter.rowCount() == 7  # 1 Workdir, 5 Commits, 1 Truncated
+
+    # Select a commit
+    qlvClickNthRow(rw.graphView, 3)
+    selectedCommit = rw.graphView.currentCommitId
+    selectedLocator = rw.navLocator
+
+    # Load a few more commits
+    rw.processInternalLink(makeInternalLink("expandlog", n=str(8)))
+    assert mainWindow.currentRepoWidget() is rw, "RepoWidget must not be replaced"
+    assert rw.repoModel.numRealCommits == 8
+    assert rw.repoModel.truncatedHistory
+    assert rw.graphView.clFilter.rowCount() == 10  # 1 Workdir, 8 Commits, 1 Truncated
+    assert rw.graphView.clModel._extraRow == SpecialRow.TruncatedHistory
+
+    # Selection must be preserved
+    assert rw.graphView.currentCommitId == selectedCommit
+    assert rw.navLocator.isSimilarEnoughTo(selectedLocator)
+
+    # Move a ref so that the top of the graph gets spliced
+    shell("git commit --allow-empty -m 'spliced on top'", wd)
+    rw.refreshRepo()
+    assert rw.repoModel.numRealCommits == 9
+    assert rw.repoModel.truncatedHistory
+
+    # Load a few more commits after splicing
+    rw.processInternalLink(makeInternalLink("expandlog", n=str(12)))
+    assert rw.repoModel.numRealCommits == 12
+    assert rw.repoModel.truncatedHistory
+    assert rw.graphView.currentCommitId == selectedCommit
+
+    # Load the rest of the history
+    rw.processInternalLink(makeInternalLink("expandlog", n=str(0)))
+    assert mainWindow.currentRepoWidget() is rw
+    assert not rw.repoModel.truncatedHistory
+    assert rw.graphView.clModel._extraRow == SpecialRow.Invalid
+    assert rw.graphView.clFilter.rowCount() == len(rw.repoModel.commitSequence)
+    assert rw.graphView.currentCommitId == selectedCommit
+    extendedGraph = snapshotGraph(rw.repoModel)
+
+    # The extended graph must be identical to a fresh full load
+    rw.replaceWithStub(maxCommits=0)
+    rw = mainWindow.currentRepoWidget()
+    assert not rw.repoModel.truncatedHistory
+    assert snapshotGraph(rw.repoModel) == extendedGraph
+
+
 @pytest.mark.parametrize("dedicatedNicknameDialog", [True, False])
 def testRepoNickname(tempDir, mainWindow, dedicatedNicknameDialog):
     wd = unpackRepo(tempDir)
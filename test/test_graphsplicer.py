@@ -403,3 +403,64 @@ def testGraphSplicing(scenarioKey):
                            newHeads=heads1, keyframeInterval=KF_INTERVAL_TEST)
     gsl2.sendAll(sequence1)
     g.testConsistency()
+
+
+def _checkResumedGraph(resumed: Graph, sequence: list, heads: set):
+    """ Verify that a resumed graph is identical to a graph built in one go """
+    verification = GraphBuildLoop(heads=heads).sendAll(sequence)
+
+    numRows = len(sequence) + 1
+    assert (GraphDiagram.diagram(resumed, maxRows=numRows, verbose=True)
+            == GraphDiagram.diagram(verification.graph, maxRows=numRows, verbose=True))
+
+    # Verify that row cache is consistent
+    assert list(range(len(sequence))) == [resumed.getCommitRow(c.id) for c in sequence]
+
+    # Nuke KFs to force going thru everything again
+    resumed.keyframes = []
+    resumed.keyframeRows = []
+    resumed.testConsistency()
+
+    return verification
+
+
+@pytest.mark.parametrize('scenarioKey', SCENARIOS.keys())
+def testResumeTruncatedGraph(scenarioKey):
+    _textGraph1, textGraph2, _expectEquilibrium = SCENARIOS[scenarioKey]
+    sequence, heads = GraphDiagram.parseDefinition(textGraph2)
+
+    for cut in range(1, len(sequence)):
+        truncated = GraphBuildLoop(heads=heads, keyframeInterval=KF_INTERVAL_TEST).sendAll(sequence[:cut])
+        truncated.graph.testConsistency()
+
+        resumed = GraphBuildLoop(heads=heads, keyframeInterval=KF_INTERVAL_TEST,
+                                 resumeGraph=truncated.graph, resumeSequence=sequence[:cut])
+        resumed.sendAll(sequence[cut:])
+        assert resumed.graph is truncated.graph
+
+        verification = _checkResumedGraph(resumed.graph, sequence, heads)
+        assert resumed.hiddenCommits == verification.hiddenCommits
+        assert resumed.foreignCommits == verification.foreignCommits
+
+
+@pytest.mark.parametrize('scenarioKey', [k for k, v in SCENARIOS.items() if v[2]])
+def testResumeTruncatedGraphAfterSplicing(scenarioKey):
+    textGraph1, textGraph2, _expectEquilibrium = SCENARIOS[scenarioKey]
+    sequence1, heads1 = GraphDiagram.parseDefinition(textGraph1)
+    sequence2, heads2 = GraphDiagram.parseDefinition(textGraph2)
+
+    # Truncate the old graph by one commit, then splice the new sequence on
+    # top of it. The graph now spans several batches of rows.
+    g = GraphBuildLoop(keyframeInterval=KF_INTERVAL_TEST).sendAll(sequence1[:-1]).graph
+    spliceLoop = GraphSpliceLoop(g, sequence1[:-1], heads1, heads2, keyframeInterval=KF_INTERVAL_TEST)
+    spliceLoop.sendAll(sequence2)
+    spliced = spliceLoop.commitSequence
+    del spliceLoop
+
+    if not spliced or [c.id for c in spliced] != [c.id for c in sequence2[:len(spliced)]]:
+        pytest.skip("spliced sequence isn't a prefix of the new sequence")
+
+    resumed = GraphBuildLoop(heads=heads2, keyframeInterval=KF_INTERVAL_TEST,
+                             resumeGraph=g, resumeSequence=spliced)
+    resumed.sendAll(sequence2[len(spliced):])
+    _checkResumedGraph(g, sequence2, heads2)
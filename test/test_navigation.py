@@ -6,10 +6,12 @@
 
 import pytest
 
+from gitfourchette.gitdriver import GitDriver
 from gitfourchette.graphview.commitlogmodel import SpecialRow
 from gitfourchette.nav import NavContext, NavLocator
 from gitfourchette.repomodel import UC_FAKEID
 from gitfourchette.repowidget import RepoWidget
+from gitfourchette.tasks import RepoTask
 from . import reposcenario
 from .util import *
 
@@ -485,3 +487,70 @@ def testSelectNextOrPreviousFile(tempDir, mainWindow):
     assert test("prev", NavLocator.inCommit(oid, "a/a2.txt"))
     assert test("prev", NavLocator.inCommit(oid, "a/a1.txt"))
     assert test("prev", NavLocator.inCommit(oid, "a/a1.txt"))
+
+
+def testNeighborCommitDiffsArePrefetched(tempDir, mainWindow, monkeypatch):
+    wd = unpackRepo(tempDir)
+    rw = mainWindow.openRepo(wd)
+    cache = rw.repoModel.commitDiffCache
+
+    oid = Oid(hex="6e1475206e57110fcef4b92320436c1e9872a322")
+    rw.jump(NavLocator.inCommit(oid))
+
+    neighbors = rw.graphView.getNeighborCommits(oid)
+    assert len(neighbors) == 2
+    assert oid not in neighbors
+
+    def isPrefetched(o):
+        return commit_diff_pair(rw.repo.peel_commit(o)) in cache
+    waitUntilTrue(lambda: all(isPrefetched(o) for o in neighbors))
+
+    # Visiting a prefetched commit must not shell out to 'git diff --raw'
+    diffRawCalls = []
+    originalBuild = GitDriver.buildDiffRawCommand
+    monkeypatch.setattr(GitDriver, "buildDiffRawCommand", lambda diffAB: diffRawCalls.append(diffAB) or originalBuild(diffAB))
+    for o in [*neighbors, oid]:
+        rw.jump(NavLocator.inCommit(o))
+        assert rw.graphView.currentCommitId == o
+        assert not rw.committedFiles.isEmpty()
+    assert not diffRawCalls
+
+    # Changing diff options must flush the cache
+    rw.repo.config["diff.renames"] = "false"
+    rw.jump(NavLocator.inWorkdir())
+    rw.jump(NavLocator.inCommit(oid))
+    assert diffRawCalls[0] == commit_diff_pair(rw.repo.peel_commit(oid))
+
+
+def testNeighborPatchesArePrefetched(tempDir, mainWindow, monkeypatch):
+    wd = unpackRepo(tempDir)
+    reposcenario.fileWithStagedAndUnstagedChanges(wd)
+    rw = mainWindow.openRepo(wd)
+    cache = rw.repoModel.patchCache
+
+    oid = Oid(hex="83834a7afdaa1a1260568567f6ad90020389f664")
+    rw.jump(NavLocator.inCommit(oid, "a/a1.txt"), check=True)
+
+    # The next file in the list should be prefetched in the background
+    waitUntilTrue(lambda: any(entry.document is not None for entry in cache.cache.values()))
+
+    diffCalls = []
+    originalCreate = RepoTask.createGitProcess
+    monkeypatch.setattr(RepoTask, "createGitProcess", lambda task, *a, **kw: diffCalls.append(a) or originalCreate(task, *a, **kw))
+
+    # Selecting the prefetched file must not shell out to 'git diff'
+    rw.jump(NavLocator.inCommit(oid, "a/a2.txt"), check=True)
+    assert not [call for call in diffCalls if "a/a2.txt" in call]
+    assert "a2" in rw.diffView.toPlainText()
+
+    # Going back to a file we've already seen must not shell out either
+    rw.jump(NavLocator.inCommit(oid, "a/a1.txt"), check=True)
+    assert not [call for call in diffCalls if "a/a1.txt" in call]
+    assert "a1" in rw.diffView.toPlainText()
+
+    # Workdir patches must be dropped when the workdir is refreshed
+    rw.jump(NavLocator.inUnstaged("a/a1.txt"), check=True)
+    assert any(entry.isWorkdir for entry in cache.cache.values())
+    writeFile(f"{wd}/a/a1.txt", "new contents\n")
+    rw.refreshRepo()
+    assert "new contents" in rw.diffView.toPlainText()
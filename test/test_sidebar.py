@@ -127,6 +127,85 @@ def testSidebarCollapsedHeaderShowsChildCount(tempDir, mainWindow):
         "Remotes (1)", "Tags (1)", "Stashes (0)", "Submodules (0)"]
 
 
+def testSidebarRefreshIsIncremental(tempDir, mainWindow):
+    wd = unpackRepo(tempDir)
+    rw = mainWindow.openRepo(wd)
+    sb = rw.sidebar
+    sm = sb.sidebarModel
+
+    resets = []
+    insertions = []
+    removals = []
+    sm.modelReset.connect(lambda: resets.append(1))
+    sm.rowsInserted.connect(lambda parent, first, last: insertions.append(last - first + 1))
+    sm.rowsRemoved.connect(lambda parent, first, last: removals.append(last - first + 1))
+
+    remoteNode = sb.findNodeByKind(SidebarItem.Remote)
+    masterNode = sb.findNodeByRef("refs/heads/master")
+    sb.selectNode(remoteNode)
+
+    shell("""
+        git branch newbranch1
+        git branch newbranch2
+        git branch -D no-parent
+        git tag newtag
+    """, wd)
+    rw.refreshRepo()
+
+    assert not resets
+    assert sorted(insertions) == [1, 2]  # one run of 2 branches, one tag
+    assert removals == [1]
+
+    # Surviving nodes keep their identity (and the selection sticks)
+    assert sb.findNodeByKind(SidebarItem.Remote) is remoteNode
+    assert sb.findNodeByRef("refs/heads/master") is masterNode
+    assert sb.selectedNode() is remoteNode
+    assert "refs/heads/newbranch1" in sm.nodesByRef
+    assert "refs/heads/no-parent" not in sm.nodesByRef
+
+    # Rows must be consistent with a tree built from scratch
+    def flatten(root):
+        return [(n.kind, n.data, n.displayName, n.row, n.parent.kind) for n in root.walk()]
+    freshRoot, freshNodesByRef = sm.buildTree(None)
+    assert flatten(sm.rootNode) == flatten(freshRoot)
+    assert sm.nodesByRef.keys() == freshNodesByRef.keys()
+
+
+def testSidebarLazyTags(tempDir, mainWindow):
+    wd = unpackRepo(tempDir)
+    rw = mainWindow.openRepo(wd)
+    sb = rw.sidebar
+
+    tagHeader = sb.findNodeByKind(SidebarItem.TagsHeader)
+    sb.collapse(sb.nodeToFilterIndex(tagHeader))
+
+    # Reopen the repo with the tag header collapsed
+    mainWindow.closeTab(0)
+    rw = mainWindow.openRepo(wd)
+    sb = rw.sidebar
+    sm = sb.sidebarModel
+
+    tagHeader = sb.findNodeByKind(SidebarItem.TagsHeader)
+    tagHeaderIndex = sb.nodeToFilterIndex(tagHeader)
+    assert tagHeader.lazyChildren
+    assert sm.rowCount(sm.createIndexFromNode(tagHeader)) == 0
+    assert tagHeaderIndex.data() == "Tags (1)"
+    assert "refs/tags/annotated_tag" not in sm.nodesByRef
+
+    # Tags stay unpopulated across refreshes while collapsed
+    shell("git tag newtag", wd)
+    rw.refreshRepo()
+    assert sb.findNodeByKind(SidebarItem.TagsHeader) is tagHeader
+    assert tagHeaderIndex.data() == "Tags (2)"
+    assert not sb.findNodesByKind(SidebarItem.Tag)
+
+    # Expanding the header populates it
+    sb.expand(tagHeaderIndex)
+    assert tagHeader.lazyChildren is None
+    assert sb.countNodesByKind(SidebarItem.Tag) == 2
+    assert sm.isAncestryChainExpanded(sb.findNodeByRef("refs/tags/newtag"))
+
+
 def testSidebarCollapseExpandAllFolders(tempDir, mainWindow):
     wd = unpackRepo(tempDir)
     shell("""
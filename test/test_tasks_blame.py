@@ -14,8 +14,9 @@ import pytest
 from collections.abc import Iterator
 from typing import Literal, ClassVar
 
-from gitfourchette.blameview.blamemodel import Revision
 from gitfourchette.forms.commitinfodialog import CommitInfoDialog
+from gitfourchette.gitdriver import GitDriver
+from gitfourchette.gitdriver.parsers import IncrementalBlameParser, parseGitBlame
 from gitfourchette.graphview.commitlogmodel import CommitLogModel
 from .util import *
 
@@ -475,8 +476,9 @@ def testInterruptLongBlame(blameWindow, taskThread):
     assert blameWindow.olderButton.isEnabled()
     assert not blameWindow.newerButton.isEnabled()
 
-    # The new text isn't loaded yet
-    assert "ciao mondo" not in blameWindow.textEdit.toPlainText()
+    # The new text is shown right away, but it isn't annotated yet
+    assert "ciao mondo" in blameWindow.textEdit.toPlainText()
+    assert not blameWindow.model.currentRevision.isAnnotated()
     assert blameWindow.busySpinner.isVisible()
 
     # Interrupt the task by jumping to another commit
@@ -579,11 +581,21 @@ def testBlameLineByLine(tempDir, mainWindow, scenarioKey):
     rw.blameFile(scenario.path, seedId)
     blameWindow = findWindow("blame", BlameWindow)
 
-    revision = blameWindow.model.revList.sequence[0]
-    annotatedLines = revision.blameLines[1:]
+    revList = blameWindow.model.revList
+    revision = revList.sequence[0]
+    lineCommits = [revList.commitForKey(key) for key in revision.blameCommits[1:]]
 
-    for line, expectedOid in zip(annotatedLines, scenario.lineCommits, strict=True):
-        assert str(line.commitId).startswith(expectedOid)
+    for commitId, expectedOid in zip(lineCommits, scenario.lineCommits, strict=True):
+        assert str(commitId).startswith(expectedOid)
+
+    # Check precomputed hunks
+    expectedHunkStarts = [i for i in range(1, len(revision.blameCommits))
+                          if i == 1 or revision.blameCommits[i] != revision.blameCommits[i - 1]]
+    assert list(revision.hunkStarts) == expectedHunkStarts
+    assert list(revision.hunkRevisionNumbers) == [
+        revList.revisionNumber(lineCommits[start - 1]) for start in expectedHunkStarts]
+    assert all(revision.hunkAt(i) == revision.hunkAt(i - 1)
+               for i in range(2, len(revision.blameCommits)) if i not in expectedHunkStarts)
 
     blameWindow.close()
     if QT5:  # Qt 5 needs a breather here to actually close window
@@ -648,8 +660,12 @@ def testBlameMissingRevisions(blameWindow):
 
     # Inject the fake commit as the source revision
     # for the first line in the current revision
-    blameWindow.model.currentRevision.blameLines[0] = Revision.BlameLine(missingId, 0)
-    blameWindow.model.currentRevision.blameLines[1] = Revision.BlameLine(missingId, 0)
+    revList = blameWindow.model.revList
+    revision = blameWindow.model.currentRevision
+    revision.blameCommits[0] = revList.commitKey(missingId)
+    revision.blameCommits[1] = revList.commitKey(missingId)
+    revision.indexHunks(revList)
+    assert revision.hunkRevisionNumbers[0] == -1
 
     # The application must respond gracefully beyond this point
     blameWindow.repaint()
@@ -733,3 +749,50 @@ def testBlameLine(tempDir, mainWindow):
     messages = [rw.repo[s.commitId].peel(Commit).message.strip()
                 for s in blameWindow.model.revList.sequence]
     assert messages == ["Say hello in Swedish", "Say hello in French", "Say hello in Spanish", "First commit"]
+
+
+def testIncrementalBlameParser(tempDir):
+    wd = unpackRepo(tempDir, "octopusblame")
+
+    porcelain = GitDriver.runSync("blame", "--porcelain", "--", "hello.txt", directory=wd, strict=True)
+    expectedLines = [(h, originalLine) for h, originalLine, _text in parseGitBlame(porcelain)]
+
+    incremental = GitDriver.runSync("blame", "--incremental", "--", "hello.txt", directory=wd, strict=True).encode("utf-8")
+
+    # Feed the output in awkwardly-sized chunks to make sure that the parser
+    # can resume in the middle of a line
+    for chunkSize in [1, 7, len(incremental)]:
+        parser = IncrementalBlameParser()
+        lines: dict[int, tuple[str, int]] = {}
+        for i in range(0, len(incremental), chunkSize):
+            for hexHash, originalLine, finalLine, count in parser.feed(incremental[i: i + chunkSize]):
+                for j in range(count):
+                    lines[finalLine + j] = (hexHash, originalLine + j)
+        assert [lines[i] for i in sorted(lines)] == expectedLines
+
+
+def testBlameGutterPendingLines(blameWindow):
+    blameModel = blameWindow.model
+    revision = blameModel.currentRevision
+    assert revision.isAnnotated()
+    lineCount = len(revision.blameCommits) - 1
+
+    # Roll the current revision back to a 'git blame' in progress,
+    # with the second half of the file still pending
+    realCommits = revision.blameCommits
+    realOrigins = revision.blameOrigins
+    revision.beginAnnotation(lineCount, realCommits[0])
+    half = lineCount // 2
+    for i in range(1, 1 + half):
+        revision.annotateLines(realCommits[i], realOrigins[i], i, 1)
+    revision.indexHunks(blameModel.revList)
+    assert list(revision.hunkRevisionNumbers)[-1] == 0
+    assert not revision.isAnnotated()
+
+    # The application must respond gracefully to pending lines
+    blameWindow.repaint()
+    pendingLinePos = qteBlockPoint(blameWindow.textEdit, lineCount - 1)
+    menu = summonContextMenu(blameWindow.textEdit.viewport(), pendingLinePos)
+    with pytest.raises(KeyError):
+        findMenuAction(menu, "blame file at")
+    menu.close()
@@ -819,6 +819,104 @@ def testRecallCommit(tempDir, mainWindow):
     assert rw.navLocator.commit == lostId
 
 
+
+def testRecallCommitFromLostCommitList(tempDir, mainWindow):
+    lostId = Oid(hex="c9ed7bf12c73de26422b7c5a44d74cfce5a8993b")
+    wd = unpackRepo(tempDir)
+    shell("""
+        git remote remove origin
+        git switch no-parent
+        git branch -D master
+    """, wd)
+    rw = mainWindow.openRepo(wd)
+
+    triggerMenuAction(mainWindow.menuBar(), "repo/lost commit")
+    dlg = findQDialog(rw, "lost commit")
+    tree: QTreeWidget = dlg.findChild(QTreeWidget, "LostCommitList")
+    listedIds = [tree.topLevelItem(i).data(0, Qt.ItemDataRole.UserRole) for i in range(tree.topLevelItemCount())]
+    assert str(lostId) in listedIds
+
+    # Ancestors of the lost commit aren't dangling, so they shouldn't be listed
+    lostParent = rw.repo.peel_commit(lostId).parent_ids[0]
+    assert str(lostParent) not in listedIds
+
+    # Filter the list by message
+    lostSummary = rw.repo.peel_commit(lostId).message.splitlines()[0]
+    QTest.keyClicks(dlg.lineEdit, lostSummary)
+    assert tree.topLevelItemCount() >= 1
+    item = tree.topLevelItem(0)
+    assert item.data(0, Qt.ItemDataRole.UserRole) == str(lostId)
+
+    # Double-click recalls the commit
+    tree.itemDoubleClicked.emit(item, 0)
+    assert lostId in rw.repoModel.refsAt
+    assert rw.navLocator.commit == lostId
+
+
+def testIndexLostCommitsInLargeObjectStore(tempDir, mainWindow, monkeypatch):
+    numChainCommits = 3000
+    numDanglingBranches = 300
+
+    wd = unpackRepo(tempDir)
+
+    # Synthesize a large pack: a long chain plus many one-off commits,
+    # then delete all their refs so that the commits become unreachable.
+    stream = []
+    for i in range(numChainCommits + numDanglingBranches):
+        isChain = i < numChainCommits
+        ref = "refs/heads/chain" if isChain else f"refs/heads/oneoff{i}"
+        message = f"synthetic {i}"
+        stream += [
+            f"commit {ref}",
+            f"mark :{i + 1}",
+            f"committer Test <test@example.com> {1700000000 + i} +0000",
+            f"data {len(message)}",
+            message,
+            *([f"from :{i}"] if isChain and i > 0 else []),
+            "M 644 inline file.txt",
+            f"data {len(str(i))}",
+            str(i),
+            "",
+        ]
+    writeFile(f"{wd}/.git/synthetic.fi", "\n".join(stream))
+    shell("""
+        git fast-import --quiet < .git/synthetic.fi
+        git for-each-ref --format='delete %(refname)' refs/heads/chain 'refs/heads/oneoff*' | git update-ref --stdin
+        git commit-tree -m 'loose dangling commit' HEAD^{tree}
+    """, wd)
+
+    rw = mainWindow.openRepo(wd)
+    index = rw.repoModel.lostCommitIndex
+
+    numLookups = 0
+    originalLookUp = index._lookUp
+
+    def countingLookUp(*args):
+        nonlocal numLookups
+        numLookups += 1
+        return originalLookUp(*args)
+
+    monkeypatch.setattr(index, "_lookUp", countingLookUp)
+
+    triggerMenuAction(mainWindow.menuBar(), "repo/lost commit")
+    dlg = findQDialog(rw, "lost commit")
+    dlg.reject()
+
+    summaries = [lost.summary for lost in index.lostCommits]
+    assert f"synthetic {numChainCommits - 1}" in summaries  # tip of the chain
+    assert "synthetic 0" not in summaries  # buried in the chain
+    assert all(f"synthetic {i}" in summaries for i in range(numChainCommits, numChainCommits + numDanglingBranches))
+    assert "loose dangling commit" in summaries
+    assert numLookups >= numChainCommits + numDanglingBranches + 1
+
+    # Scanning again must not look up any commits that were already indexed
+    numLookups = 0
+    triggerMenuAction(mainWindow.menuBar(), "repo/lost commit")
+    dlg = findQDialog(rw, "lost commit")
+    dlg.reject()
+    assert numLookups == 0
+    assert len(index.lostCommits) == len(summaries)
+
 def testFastForwardCurrentBranch(tempDir, mainWindow):
     targetCommit = Oid(hex="49322bb17d3acc9146f98c97d078513228bbf3c0")
 
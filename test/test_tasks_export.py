@@ -9,6 +9,7 @@ import pytest
 
 from . import reposcenario
 from .util import *
+from gitfourchette.gitdriver import GitDriver
 from gitfourchette.nav import NavLocator
 from gitfourchette.sidebar.sidebarmodel import SidebarItem
 
@@ -167,3 +168,36 @@ def testExportPatchFromFileList(tempDir, mainWindow, commitHex, path):
     triggerMenuAction(mainWindow.menuBar(), "file/revert patch")
     acceptQFileDialog(rw, "revert patch", f"{tempDir.name}/foo.patch")
     acceptQMessageBox(rw, "revert.+patch")
+
+
+def testExportPatchCollectionInBatches(tempDir, mainWindow, monkeypatch):
+    # Force tiny batches so that the export spans several 'git diff' calls
+    monkeypatch.setattr(GitDriver, "DiffBatchMaxDeltas", 3)
+
+    wd = unpackRepo(tempDir)
+    shell("""
+        mkdir batch
+        for i in $(seq 1 10); do echo "file $i" > "batch/f$i.txt"; done
+        git add batch
+        git commit -q -m "batch"
+        for i in $(seq 1 10); do echo "modified $i" >> "batch/f$i.txt"; done
+        echo "untracked" > "batch/new*.txt"
+        git rm -q b/b1.txt
+    """, wd)
+    rw = mainWindow.openRepo(wd)
+
+    rw.dirtyFiles.selectAll()
+    assert len(list(rw.dirtyFiles.selectedDeltas())) == 11
+    rw.dirtyFiles.savePatchAs()
+    acceptQFileDialog(rw, "export patch", f"{tempDir.name}/batch.patch")
+
+    patch = readTextFile(f"{tempDir.name}/batch.patch")
+    assert patch.count("diff --git ") == 11
+    assert "+modified 10" in patch
+    assert "+untracked" in patch
+
+    triggerMenuAction(mainWindow.menuBar(), "file/revert patch")
+    acceptQFileDialog(rw, "revert patch", f"{tempDir.name}/batch.patch")
+    acceptQMessageBox(rw, "revert.+patch")
+    assert qlvGetRowData(rw.dirtyFiles) == []
+    assert qlvGetRowData(rw.stagedFiles) == ["b/b1.txt"]
@@ -227,7 +227,7 @@ def testNewStashNoIgnoredFiles(tempDir, mainWindow):
 
 @pytest.mark.parametrize("trashEnabled", [True, False])
 def testPopStash(tempDir, mainWindow, trashEnabled):
-    GFApplication.instance().applyPrefs(maxTrashFiles=250 if trashEnabled else 0)
+    GFApplication.instance().applyPrefs(maxTrashMB=100 if trashEnabled else 0)
 
     wd = unpackRepo(tempDir)
     reposcenario.stashedChange(wd)
@@ -250,9 +250,9 @@ def testPopStash(tempDir, mainWindow, trashEnabled):
 
     if trashEnabled:
         # Popped stash goes to trash
-        lastTrashFile = Trash.instance().trashFiles[-1]
-        assert "DELETED_STASH" in lastTrashFile.name
-        assert str(stash.commit_id) in readTextFile(lastTrashFile)
+        lastTrashItem = Trash.instance().entries[0].items[0]
+        assert lastTrashItem.path == "DELETED_STASH"
+        assert str(stash.commit_id) in Trash.instance().load(lastTrashItem).decode("utf-8")
     else:
         assert 0 == Trash.instance().count()
 
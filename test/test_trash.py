@@ -4,28 +4,22 @@
 # For full terms, see the included LICENSE file.
 # -----------------------------------------------------------------------------
 
-from tarfile import TarFile
+import os
 
-from gitfourchette.trash import Trash
+from gitfourchette.forms.trashbrowser import TrashBrowser
+from gitfourchette.trash import Trash, TrashItemKind
 from .util import *
 
 
-def _fillTrashWithJunk(n):
+def _fillTrashWithJunk(n, size=0):
     trash = Trash.instance()
-    trash.refreshFiles()
     trash.clear()
-    trash.trashDir.mkdir(parents=True, exist_ok=True)
 
     for i in range(n):
-        junkPath = Path(trash.trashDir, f"19991231T235900-test{i}.txt")
+        junk = os.urandom(size).hex() if size else f"test{i}"
+        trash.backupText("/fake/workdir", junk, f"junk{i}.txt")
 
-        # Alternate between bogus text files and bogus symlinks
-        if i % 2 == 0:
-            junkPath.write_text(f"test{i}")
-        else:
-            junkPath.symlink_to(trash.trashDir)
-
-    trash.refreshFiles()
+    assert trash.count() == n
 
 
 def testBackupDiscardedPatches(tempDir, mainWindow):
@@ -68,55 +62,99 @@ def testBackupDiscardedPatches(tempDir, mainWindow):
     assert qlvGetRowData(rw.stagedFiles) == []
 
     trash = Trash.instance()
-    trash.refreshFiles()
-    assert len(trash.trashFiles) == 0
+    trash.reload()
+    assert trash.count() == 0
 
     rw.dirtyFiles.setFocus()
     QTest.keySequence(rw.dirtyFiles, QKeySequence("Ctrl+A,Del"))
     acceptQMessageBox(rw, "really discard changes")
 
-    def findInTrash(partialFileName: str) -> Path | None:
-        return next((f for f in trash.trashFiles if partialFileName in f.name), None)
+    def findInTrash(path: str):
+        return next((item for entry in trash.entries for item in entry.items if item.path == path), None)
 
-    assert findInTrash("a1.txt")
-    assert findInTrash("SomeNewFile.txt")
-    assert findInTrash("SmallTree.tar")
+    assert findInTrash("a/a1.txt").kind == TrashItemKind.Patch
+    assert findInTrash("SomeNewFile.txt").kind == TrashItemKind.File
+    assert findInTrash("SmallTree").kind == TrashItemKind.Tarball
     assert not findInTrash("a2.txt")  # file deletions shouldn't be backed up
     assert not findInTrash("MassiveFile.txt")  # file is too large to be backed up
     assert not findInTrash("LargeTree")  # tree is too large to be backed up
 
     # Find symlink
     if not WINDOWS:
-        assert findInTrash("symlink")
-        assert findInTrash("symlink").is_symlink()
+        assert findInTrash("symlink").kind == TrashItemKind.Symlink
+        assert trash.load(findInTrash("symlink")) == os.fsencode(f"{wd}/this/path/does/not/exist")
 
-    # Make sure tree.tar contains our repo
-    tarballFiles = TarFile(findInTrash("SmallTree.tar")).getnames()
-    assert "SmallTree" in tarballFiles
-    assert "SmallTree/.git/config" in tarballFiles
-    assert "SmallTree/hello.txt" in tarballFiles
+    # Make sure the tarball contains our repo
+    restoreDir = Path(tempDir.name, "restored")
+    trash.restore(findInTrash("SmallTree"), restoreDir)
+    assert Path(restoreDir, "SmallTree/.git/config").is_file()
+    assert readTextFile(Path(restoreDir, "SmallTree/hello.txt")) == "this untracked tree should end up in a tarball"
 
+    # Contents are compressed on disk
+    item = findInTrash("SomeNewFile.txt")
+    assert trash.load(item) == b"this file is untracked"
+    assert trash.objectPath(item.digest).read_bytes() != b"this file is untracked"
 
-def testTrashFull(tempDir, mainWindow):
-    # The mainWindow fixture ensures proper setup/teardown of the trash
-    wd = unpackRepo(tempDir)
-    writeFile(F"{wd}/a/a1.txt", "a1\nPENDING CHANGE\n")  # unstaged change
-    rw = mainWindow.openRepo(wd)
 
-    from gitfourchette import settings
+def testTrashEvictsByByteBudget(tempDir, mainWindow):
+    GFApplication.applyPrefs(maxTrashMB=1)
+    trash = Trash.instance()
 
-    # Create N junk files in trash
-    _fillTrashWithJunk(settings.prefs.maxTrashFiles * 2)
+    # Random data doesn't compress, so each entry takes up at least 300 KB
+    _fillTrashWithJunk(3, size=150 * 1024)
+    oldestItem = trash.entries[-1].items[0]
+    assert trash.objectPath(oldestItem.digest).is_file()
 
-    qlvClickNthRow(rw.dirtyFiles, 0)
-    QTest.keyPress(rw.dirtyFiles, Qt.Key.Key_Delete)
-    acceptQMessageBox(rw, "really discard changes")
+    trash.backupText("/fake/workdir", os.urandom(150 * 1024).hex(), "straw.txt")
 
-    # Trash should have been purged to make room for new patch
-    trashInstance = Trash.instance()
-    assert len(trashInstance.trashFiles) == settings.prefs.maxTrashFiles
-    assert len(list(trashInstance.trashDir.iterdir())) == settings.prefs.maxTrashFiles
-    assert "a1.txt" in trashInstance.trashFiles[0].name
+    # The oldest entry was evicted to make room for the new one
+    assert trash.count() == 3
+    assert trash.entries[0].items[0].path == "straw.txt"
+    assert oldestItem not in trash.entries[-1].items
+    assert not trash.objectPath(oldestItem.digest).exists()
+    assert trash.storedBytes <= Trash.maxBytes()
+
+    # The manifest agrees with the in-memory state
+    trash.reload()
+    assert trash.count() == 3
+    assert trash.entries[0].items[0].path == "straw.txt"
+
+
+def testTrashDeduplicatesContent(tempDir, mainWindow):
+    wd = tempDir.name
+    writeFile(f"{wd}/generated.bin", "same old content\n" * 1000)
+
+    trash = Trash.instance()
+    for _i in range(5):
+        trash.backupFile(wd, "generated.bin")
+
+    assert trash.count() == 5
+    digests = {entry.items[0].digest for entry in trash.entries}
+    assert len(digests) == 1
+    assert trash.storedBytes == trash.entries[0].items[0].storedSize
+    assert trash.storedBytes < len("same old content\n" * 1000)
+
+    # Dropping one entry must not delete the object shared by the others
+    trash.removeEntry(trash.entries[-1])
+    assert trash.objectPath(digests.pop()).is_file()
+    assert trash.load(trash.entries[0].items[0]) == b"same old content\n" * 1000
+
+
+def testTrashDiscardSameFileRepeatedly(tempDir, mainWindow):
+    wd = unpackRepo(tempDir)
+    rw = mainWindow.openRepo(wd)
+    trash = Trash.instance()
+
+    for _i in range(3):
+        writeFile(f"{wd}/SomeNewFile.txt", "regenerated file")
+        rw.refreshRepo()
+        qlvClickNthRow(rw.dirtyFiles, 0)
+        QTest.keyPress(rw.dirtyFiles, Qt.Key.Key_Delete)
+        acceptQMessageBox(rw, "really discard changes")
+        assert not os.path.exists(f"{wd}/SomeNewFile.txt")
+
+    assert trash.count() == 3
+    assert len(trash.objectRefs) == 1
 
 
 def testClearTrash(mainWindow):
@@ -132,36 +170,60 @@ def testClearTrash(mainWindow):
     acceptQMessageBox(mainWindow, "delete.+40.+discarded (patches|changes)")
     assert trashInstance.count() == 0
 
-    trashInstance.refreshFiles()
+    trashInstance.reload()
     assert trashInstance.count() == 0
     assert not list(trashInstance.trashDir.iterdir())
 
 
-def testOpenTrashFolder(mainWindow):
+def testOpenTrash(tempDir, mainWindow):
     # Attempt to open trash without any files in it
     triggerMenuAction(mainWindow.menuBar(), "help/open trash")
-    rejectQMessageBox(mainWindow, "there.s no trash folder")
+    rejectQMessageBox(mainWindow, "trash is empty")
 
-    # Open trash with some files
-    _fillTrashWithJunk(40)
-    with MockDesktopServicesContext(mainWindow) as services:
-        triggerMenuAction(mainWindow.menuBar(), "help/open trash")
-        openedPath = services.lastUrlAsLocalFile()
-        assert Trash.instance().trashDir.samefile(openedPath)
+    wd = tempDir.name
+    writeFile(f"{wd}/hello.txt", "hello trash")
+    Trash.instance().backupFile(wd, "hello.txt")
+    os.unlink(f"{wd}/hello.txt")
 
+    triggerMenuAction(mainWindow.menuBar(), "help/open trash")
+    browser: TrashBrowser = findQDialog(mainWindow, "trash")
+    assert browser.tree.topLevelItemCount() == 1
+    assert "hello.txt" in browser.tree.topLevelItem(0).text(2)
 
-def testTrashSymlinkNameConflicts(mainWindow, tempDir):
-    wd = tempDir.name
-    trash = Trash.instance()
+    # Restore the file to its original location
+    browser.tree.setCurrentItem(browser.tree.topLevelItem(0))
+    assert browser.restoreButton.isEnabled()
+    browser.restoreButton.click()
+    assert readTextFile(f"{wd}/hello.txt") == "hello trash"
+
+    # Restoring again asks before overwriting
+    writeFile(f"{wd}/hello.txt", "overwrite me")
+    browser.restoreButton.click()
+    acceptQMessageBox(browser, "already exists")
+    assert readTextFile(f"{wd}/hello.txt") == "hello trash"
 
-    from gitfourchette import settings
-    settings.prefs.maxTrashFiles = max(300, settings.prefs.maxTrashFiles)
+    # Save a copy elsewhere
+    browser.saveAsButton.click()
+    savedPath = acceptQFileDialog(browser, "save.+as", f"{wd}/copy.txt")
+    assert readTextFile(savedPath) == "hello trash"
 
-    assert trash.maxFileCount() >= 300
-    assert trash.MaxUniqueSuffix < trash.maxFileCount()
+    browser.close()
 
-    Path(wd, "trashed_symlink").symlink_to(Path(wd, "nowhere"))
 
-    # Saturate trash with symlinks
-    while trash.count() < trash.maxFileCount():
-        trash.backupFile(wd, "trashed_symlink")
+def testTrashManifestSurvivesRestart(tempDir, mainWindow):
+    wd = tempDir.name
+    writeFile(f"{wd}/hello.txt", "hello")
+
+    trash = Trash.instance()
+    trash.backupFile(wd, "hello.txt")
+    trash.backupPatch(wd, "--- a/x\n+++ b/x\n", "x")
+
+    freshTrash = Trash()
+    assert [e.id for e in freshTrash.entries] == [e.id for e in trash.entries]
+    assert freshTrash.storedBytes == trash.storedBytes
+    assert freshTrash.entries[0].items[0].kind == TrashItemKind.Patch
+
+    # IDs stay unique and sortable even when several entries are created within the same second
+    assert trash.entries[0].id > trash.entries[1].id
+    newEntry = freshTrash.backupText(wd, "hi", "note")
+    assert newEntry.id > trash.entries[0].id